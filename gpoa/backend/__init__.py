@@ -16,15 +16,24 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
 
 from util.windows import smbcreds
 from .samba_backend import samba_backend
 from .nodomain_backend import nodomain_backend
 from util.logging import log
 from util.config import GPConfig
-from util.util import get_uid_by_username, touch_file
-from util.paths import get_dconf_config_path
-from storage.dconf_registry import Dconf_registry, create_dconf_ini_file
+from util.util import get_uid_by_username
+from util.paths import (
+      get_dconf_config_path
+    , get_dconf_config_hash_path
+    , get_dconf_config_snapshot_path
+)
+from storage.dconf_registry import (
+      Dconf_registry
+    , create_dconf_ini_file
+    , save_policy_snapshot
+)
 
 def backend_factory(dc, username, is_machine, no_domain = False):
     '''
@@ -68,6 +77,8 @@ def save_dconf(username, is_machine):
     else:
         uid = get_uid_by_username(username) if not is_machine else None
     target_file = get_dconf_config_path(uid)
-    touch_file(target_file)
+    hash_file = get_dconf_config_hash_path(uid)
     Dconf_registry.apply_template(uid)
-    create_dconf_ini_file(target_file,Dconf_registry.global_registry_dict)
+    changed = create_dconf_ini_file(target_file, Dconf_registry.global_registry_dict, hash_file)
+    if changed or not os.path.exists(get_dconf_config_snapshot_path(uid)):
+        save_policy_snapshot(uid, Dconf_registry.global_registry_dict)
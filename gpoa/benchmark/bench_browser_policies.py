@@ -0,0 +1,104 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2026 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+Benchmark of Chromium policies.json generation over the synthetic key
+set of the size of full Chrome ADMX. Run from gpoa directory:
+
+    python3 -m benchmark.bench_browser_policies [--policies N] [--dir DIR]
+'''
+
+import argparse
+import tempfile
+
+from frontend.appliers.browser_policy import (
+      build_chromium_policies
+    , write_chromium_policies
+)
+from frontend.chromium_applier import chromium_applier
+from .bench_dconf_registry import measure
+
+
+registry_branch = 'Software/Policies/Google/Chrome'
+valuename_typeint = chromium_applier._chromium_applier__valuename_typeint
+
+
+class policy_entry:
+    def __init__(self, keyname, valuename, regtype, data):
+        self.keyname = keyname
+        self.valuename = valuename
+        self.hive_key = '{}/{}'.format(keyname, valuename)
+        self.type = regtype
+        self.data = data
+
+
+def make_keys(policies_count, list_size=20):
+    '''
+    Generate DWORD, string and list policies both mandatory and
+    recommended ones in the proportion they appear in Chrome ADMX.
+    '''
+    keys = list()
+    int_names = sorted(valuename_typeint)
+    for num in range(policies_count):
+        keyname = registry_branch
+        if num % 5 == 0:
+            keyname = '{}/Recommended'.format(registry_branch)
+        kind = num % 4
+        if kind == 0:
+            name = int_names[num % len(int_names)] if num % 8 == 0 else 'BoolPolicy{}'.format(num)
+            keys.append(policy_entry(keyname, name, 4, str(num % 3)))
+        elif kind == 1:
+            keys.append(policy_entry(keyname, 'StringPolicy{}'.format(num), 1,
+                'https://intranet.example.com/policy/{}'.format(num)))
+        elif kind == 2:
+            keys.append(policy_entry(keyname, 'JsonPolicy{}'.format(num), 1,
+                '[{{"url": "https://example.com/{}", "enabled": true}}]'.format(num)))
+        else:
+            list_key = '{}/ListPolicy{}'.format(keyname, num)
+            for item in range(1, list_size + 1):
+                keys.append(policy_entry(list_key, str(item), 1,
+                    'extension{}{};https://clients2.google.com/service/update2/crx'.format(num, item)))
+    return keys
+
+
+def run(policies_count, workdir):
+    keys = make_keys(policies_count)
+    print('Synthetic Chrome key set with {} policies, {} values'.format(policies_count, len(keys)))
+
+    policies = measure('build_chromium_policies',
+        lambda: build_chromium_policies(registry_branch, keys, valuename_typeint))
+    with tempfile.TemporaryDirectory(dir=workdir) as tmpdir:
+        managed = '{}/managed'.format(tmpdir)
+        recommended = '{}/recommended'.format(tmpdir)
+        measure('write_chromium_policies (new)',
+            lambda: write_chromium_policies(policies, managed, recommended, 'D97'))
+        measure('write_chromium_policies (same)',
+            lambda: write_chromium_policies(policies, managed, recommended, 'D97'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Browser policies benchmark')
+    parser.add_argument('--policies', type=int, default=1200,
+        help='Number of policies to generate')
+    parser.add_argument('--dir', default=None,
+        help='Directory to write policies.json files to')
+    args = parser.parse_args()
+    run(args.policies, args.dir)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2026 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+'''
+Time and memory benchmark of Dconf_registry filtering and lookups
+over synthetic registry. Run from gpoa directory:
+
+    python3 -m benchmark.bench_dconf_registry [--keys N]
+'''
+
+import argparse
+import time
+import tracemalloc
+
+from storage.dconf_registry import (
+      Dconf_registry
+    , convert_string_dconf
+)
+
+
+def make_registry(keys_count, values_per_key=50):
+    '''
+    Build registry dictionary looking like the one merged from big
+    Chromium/Firefox ADMX policy sets.
+    '''
+    registry = dict({Dconf_registry._ReadQueue: {}})
+    keys = max(1, keys_count // values_per_key)
+    for knum in range(keys):
+        keyname = 'Software/Policies/Google/Chrome/Branch{}'.format(knum)
+        values = registry.setdefault(keyname, dict())
+        for vnum in range(values_per_key):
+            if vnum % 10 == 0:
+                values['Value{}%sharp%{}'.format(vnum, knum)] = 'data{}'.format(vnum)
+            elif vnum % 2:
+                values['Value{}'.format(vnum)] = vnum
+            else:
+                values['Value{}'.format(vnum)] = 'https://example.com/{}/{}'.format(knum, vnum)
+    return registry
+
+
+def measure(name, func):
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print('{:<32} {:>10.3f} ms {:>12.1f} KiB peak {:>12.1f} KiB retained'.format(
+        name, elapsed * 1000, peak / 1024, current / 1024))
+    return result
+
+
+def run(keys_count):
+    Dconf_registry.global_registry_dict = make_registry(keys_count)
+    Dconf_registry._gpt_read_flag = True
+    paths = [
+        '{}/{}'.format(keyname, valuename)
+        for keyname, values in Dconf_registry.global_registry_dict.items()
+        for valuename in values
+    ]
+    print('Synthetic registry with {} values'.format(len(paths)))
+
+    entries = measure('filter_hklm_entries',
+        lambda: Dconf_registry.filter_hklm_entries('Software/Policies/Google/Chrome/%'))
+    measure('hive_key of all entries', lambda entries=entries: [entry.hive_key for entry in entries])
+    del entries
+    measure('get_hklm_entry', lambda: [Dconf_registry.get_hklm_entry(path) for path in paths])
+    measure('convert_string_dconf', lambda: [convert_string_dconf(path) for path in paths])
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Dconf_registry benchmark')
+    parser.add_argument('--keys', type=int, default=50000,
+        help='Number of registry values to generate')
+    args = parser.parse_args()
+    run(args.keys)
+
+if __name__ == '__main__':
+    main()
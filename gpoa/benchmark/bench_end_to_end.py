@@ -0,0 +1,295 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2026 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+'''
+End-to-end benchmark of the policy processing pipeline over synthetic
+GPT tree. GPOs are merged with gpt.merge_machine/merge_user the same way
+nodomain_backend merges local policy, then Dconf_registry is filtered,
+dconf keyfile is rendered and pure-Python appliers are run against the
+temporary root. The pipeline is run twice to measure both the cold run
+and the run with nothing changed. Run from gpoa directory:
+
+    python3 -m benchmark.bench_end_to_end [--gpos N] [--preg-entries N]
+        [--pref-entries N] [--dir DIR] [--save-baseline FILE]
+        [--baseline FILE] [--threshold RATIO]
+
+Wall time, peak RSS of the phase and the number of started
+subprocesses are reported for every phase. The peak RSS is reset before
+every phase on Linux, elsewhere it is the peak of the whole process so
+far. Results may be saved as JSON
+baseline and later compared against it, the exit code is 1 in case some
+phase got slower than the threshold allows.
+'''
+
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import frontend.appliers.envvar as envvar
+from frontend.appliers.browser_policy import (
+      build_chromium_policies
+    , write_chromium_policies
+)
+from frontend.appliers.file_cp import Files_planner
+from frontend.appliers.ini_file import apply_ini_files
+from frontend.chromium_applier import chromium_applier
+from gpt.gpt import gpt
+from storage import registry_factory
+from storage.dconf_registry import (
+      Dconf_registry
+    , create_dconf_ini_file
+)
+from storage.dconf_snapshot import save_registry_snapshot
+from .gpt_generator import gpt_generator
+
+
+chromium_branch = 'Software/Policies/Google/Chrome'
+machine_sid = 'S-1-5-21-0-0-0-1000'
+bench_username = 'benchuser'
+
+class subprocess_counter:
+    '''
+    Count processes started with subprocess module. Functions like run()
+    and check_output() create Popen objects so they are counted too.
+    '''
+    def __init__(self):
+        self.count = 0
+        self.popen_init = subprocess.Popen.__init__
+
+    def __enter__(self):
+        counter = self
+        popen_init = self.popen_init
+
+        def counting_init(popen, *args, **kwargs):
+            counter.count += 1
+            popen_init(popen, *args, **kwargs)
+
+        subprocess.Popen.__init__ = counting_init
+        return self
+
+    def __exit__(self, *exc):
+        subprocess.Popen.__init__ = self.popen_init
+
+def reset_peak_rss():
+    '''
+    Reset the peak resident set size of the process to the current one so
+    the peak of every phase is measured on its own. Linux only.
+    '''
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+    except OSError:
+        pass
+
+def get_peak_rss():
+    '''
+    Peak resident set size of the process in KiB since the last reset.
+    Falls back to the peak of the whole process lifetime.
+    '''
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+class phase_recorder:
+    def __init__(self):
+        self.results = dict()
+
+    def measure(self, name, func):
+        reset_peak_rss()
+        with subprocess_counter() as counter:
+            start = time.perf_counter()
+            result = func()
+            elapsed = time.perf_counter() - start
+        phase = dict()
+        phase['wall_ms'] = round(elapsed * 1000, 3)
+        phase['peak_rss_kib'] = get_peak_rss()
+        phase['subprocesses'] = counter.count
+        self.results[name] = phase
+        print('{:<32} {:>10.3f} ms {:>10} KiB peak RSS {:>5} subprocesses'.format(
+            name, phase['wall_ms'], phase['peak_rss_kib'], phase['subprocesses']))
+        return result
+
+def reset_storage():
+    Dconf_registry.wipe_hklm()
+    for name in ('shortcuts', 'folders', 'files', 'drives', 'scheduledtasks',
+            'environmentvariables', 'inifiles', 'services', 'printers',
+            'scripts', 'networkshares'):
+        setattr(Dconf_registry, name, list())
+    Dconf_registry._dconf_dirty.clear()
+
+def merge(gpts, is_machine):
+    for policy in gpts:
+        if is_machine:
+            policy.merge_machine()
+        else:
+            policy.merge_user()
+
+def filter_storage(storage):
+    result = dict()
+    result['chromium'] = storage.filter_hklm_entries('{}%'.format(chromium_branch))
+    result['firefox'] = storage.filter_hklm_entries('Software/Policies/Mozilla/Firefox%')
+    result['bench'] = storage.filter_hklm_entries('Software/BaseALT/Policies/Bench%')
+    result['gsettings'] = storage.filter_hkcu_entries(machine_sid, 'Software/BaseALT/Policies/gsettings%')
+    return result
+
+def render_dconf(target_root):
+    dconf_dir = os.path.join(target_root, 'dconf')
+    target_file = os.path.join(dconf_dir, 'policy.d', 'policy.ini')
+    hash_file = os.path.join(dconf_dir, 'policy.sha256')
+    changed = create_dconf_ini_file(target_file, Dconf_registry.global_registry_dict, hash_file)
+    if changed:
+        with open(hash_file) as f:
+            save_registry_snapshot(os.path.join(dconf_dir, 'policy.registry'),
+                Dconf_registry.global_registry_dict, f.read().strip())
+    # Compiling dconf database is out of scope of the benchmark
+    Dconf_registry._dconf_dirty.clear()
+
+def apply_chromium(storage, entries, target_root):
+    policies = build_chromium_policies(chromium_branch, entries,
+        chromium_applier._chromium_applier__valuename_typeint)
+    write_chromium_policies(policies
+        , os.path.join(target_root, 'chromium', 'managed')
+        , os.path.join(target_root, 'chromium', 'recommended')
+        , 'D97')
+
+def apply_shortcuts(storage, target_root):
+    changed = 0
+    applications = os.path.join(target_root, 'applications')
+    for shortcut in storage.get_shortcuts(machine_sid):
+        # Shortcut names are placed to the temporary root instead of
+        # expanding %StartMenuDir% to system directory
+        name = shortcut.dest.rpartition('%')[2].lstrip('\\/-')
+        dest = os.path.join(applications, '{}.desktop'.format(name))
+        changed += bool(shortcut.apply_desktop(dest))
+    return changed
+
+def apply_envvars(storage, target_root):
+    envvar.system_envvar_file = os.path.join(target_root, 'environment')
+    envvar.Envvar(storage.get_envvars(machine_sid), 'root').act()
+
+def run_pipeline(recorder, label, gpo_paths, target_root):
+    reset_storage()
+    storage = registry_factory()
+    gpts = recorder.measure('{}/gpt_init'.format(label),
+        lambda: [gpt(path, machine_sid, bench_username) for path in gpo_paths])
+    recorder.measure('{}/merge_machine'.format(label), lambda: merge(gpts, True))
+    recorder.measure('{}/merge_user'.format(label), lambda: merge(gpts, False))
+    entries = recorder.measure('{}/filter'.format(label), lambda: filter_storage(storage))
+    recorder.measure('{}/save_dconf'.format(label), lambda: render_dconf(target_root))
+    recorder.measure('{}/chromium'.format(label),
+        lambda: apply_chromium(storage, entries['chromium'], target_root))
+    recorder.measure('{}/files'.format(label),
+        lambda: Files_planner(storage.get_files(machine_sid), None, exe_check()).run())
+    recorder.measure('{}/ini'.format(label),
+        lambda: apply_ini_files(storage.get_ini(machine_sid)))
+    recorder.measure('{}/envvar'.format(label), lambda: apply_envvars(storage, target_root))
+    recorder.measure('{}/shortcuts'.format(label), lambda: apply_shortcuts(storage, target_root))
+
+class exe_check:
+    '''
+    Execution_check without ExtensionMarker policies
+    '''
+    def get_list_paths(self):
+        return list()
+
+    def get_list_markers(self):
+        return list()
+
+def compare(results, baseline, threshold):
+    '''
+    Print the wall time ratio for every phase and return the list of
+    phases which got slower than threshold.
+    '''
+    regressions = list()
+    print('\nComparison with baseline (current / baseline)')
+    for name, phase in results.items():
+        base = baseline.get(name)
+        if not base or not base.get('wall_ms'):
+            continue
+        ratio = phase['wall_ms'] / base['wall_ms']
+        mark = ''
+        if ratio > threshold:
+            mark = ' REGRESSION'
+            regressions.append(name)
+        print('{:<32} {:>10.3f} ms {:>10.3f} ms {:>6.2f}x{}'.format(
+            name, phase['wall_ms'], base['wall_ms'], ratio, mark))
+    return regressions
+
+def run(args):
+    with tempfile.TemporaryDirectory(dir=args.dir) as tmpdir:
+        sysvol = os.path.join(tmpdir, 'sysvol')
+        target_root = os.path.join(tmpdir, 'root')
+        os.makedirs(target_root)
+        recorder = phase_recorder()
+        generator = gpt_generator(sysvol, target_root, args.gpos, args.preg_entries, args.pref_entries)
+        gpo_paths = recorder.measure('generate', generator.generate)
+        run_pipeline(recorder, 'cold', gpo_paths, target_root)
+        run_pipeline(recorder, 'warm', gpo_paths, target_root)
+
+    report = dict()
+    report['parameters'] = dict()
+    report['parameters']['gpos'] = args.gpos
+    report['parameters']['preg_entries'] = args.preg_entries
+    report['parameters']['pref_entries'] = args.pref_entries
+    report['phases'] = recorder.results
+
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(report, f, indent=1, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline.get('parameters') != report['parameters']:
+            print('Baseline was recorded with different parameters: {}'.format(baseline.get('parameters')))
+        if compare(report['phases'], baseline.get('phases', {}), args.threshold):
+            return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='End-to-end policy processing benchmark')
+    parser.add_argument('--gpos', type=int, default=20,
+        help='Number of GPOs to generate')
+    parser.add_argument('--preg-entries', type=int, default=1000,
+        help='Number of machine Registry.pol entries per GPO')
+    parser.add_argument('--pref-entries', type=int, default=50,
+        help='Number of entries in every preference XML file')
+    parser.add_argument('--dir', default=None,
+        help='Directory to create the temporary tree in')
+    parser.add_argument('--save-baseline', default=None,
+        help='Save results to the JSON file')
+    parser.add_argument('--baseline', default=None,
+        help='Compare results with the JSON file')
+    parser.add_argument('--threshold', type=float, default=1.25,
+        help='Slowdown ratio considered as regression')
+    sys.exit(run(parser.parse_args()))
+
+if __name__ == '__main__':
+    main()
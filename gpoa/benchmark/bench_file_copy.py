@@ -0,0 +1,73 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2026 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+Throughput benchmark of local file copies done by the Files preference
+applier. Run from gpoa directory:
+
+    python3 -m benchmark.bench_file_copy [--size-mb N] [--dir DIR]
+
+Use --dir on a real disk since /tmp may reside in memory.
+'''
+
+import argparse
+import os
+import tempfile
+from pathlib import Path
+
+from util.util import copy_file_if_changed
+from .bench_dconf_registry import measure
+
+
+def make_file(filename, size_mb):
+    chunk = os.urandom(1024 * 1024)
+    with open(filename, 'wb') as f:
+        for _ in range(size_mb):
+            f.write(chunk)
+
+
+def read_write_copy(source, target):
+    Path(target).write_bytes(Path(source).read_bytes())
+
+
+def run(size_mb, workdir):
+    with tempfile.TemporaryDirectory(dir=workdir) as tmpdir:
+        source = os.path.join(tmpdir, 'source.bin')
+        make_file(source, size_mb)
+        print('Copying {} MiB file in {}'.format(size_mb, tmpdir))
+
+        measure('read_bytes/write_bytes', lambda: read_write_copy(source, os.path.join(tmpdir, 'rw.bin')))
+        target = os.path.join(tmpdir, 'target.bin')
+        measure('copy_file_if_changed (copy)', lambda: copy_file_if_changed(source, target))
+        measure('copy_file_if_changed (skip)', lambda: copy_file_if_changed(source, target))
+        # Same content, different mtime forces comparison of the content
+        os.utime(target, ns=(0, 0))
+        measure('copy_file_if_changed (compare)', lambda: copy_file_if_changed(source, target))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Files applier copy benchmark')
+    parser.add_argument('--size-mb', type=int, default=2048,
+        help='Size of the file to copy in MiB')
+    parser.add_argument('--dir', default=None,
+        help='Directory to create test files in')
+    args = parser.parse_args()
+    run(args.size_mb, args.dir)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2026 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+'''
+Measure per-call cost of log() for the debug message filtered out at
+INFO level and for the message which is actually emitted. Run from gpoa
+directory:
+
+    python3 -m benchmark.bench_logging [--calls N]
+'''
+
+import argparse
+import gettext
+import logging
+import timeit
+
+import messages
+from messages import message_with_code
+from util.logging import (
+      log
+    , slogm
+)
+
+
+def former_message_with_code(code):
+    '''
+    Message lookup log() used before, rebuilding the message dictionary
+    on every call.
+    '''
+    message = messages.debug_messages().get(int(code[1:]), 'Unknown debug code')
+    return '[' + code[0:1] + code[1:].rjust(5, '0') + ']| ' + gettext.gettext(message)
+
+def former_log(message_code, data=None):
+    logging.debug(slogm(former_message_with_code(message_code), data))
+
+def eager_log(message_code, data=None):
+    logging.debug(slogm(message_with_code(message_code), data))
+
+def report(name, func, calls):
+    elapsed = timeit.timeit(func, number=calls)
+    print('{:<40} {:>10.0f} ns/call'.format(name, elapsed / calls * 1e9))
+
+
+def run(calls):
+    logger = logging.getLogger()
+    logger.handlers = [logging.NullHandler()]
+    logdata = dict({'name': 'benchmark', 'value': 1})
+
+    logger.setLevel(logging.INFO)
+    print('Debug message at INFO level')
+    report('former log()', lambda: former_log('D54', logdata), calls)
+    report('catalog without level check', lambda: eager_log('D54', logdata), calls)
+    report('log()', lambda: log('D54', logdata), calls)
+
+    logger.setLevel(logging.DEBUG)
+    print('Debug message at DEBUG level')
+    report('former log()', lambda: former_log('D54', logdata), calls)
+    report('log()', lambda: log('D54', logdata), calls)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='log() benchmark')
+    parser.add_argument('--calls', type=int, default=100000,
+        help='Number of log() calls')
+    args = parser.parse_args()
+    run(args.calls)
+
+if __name__ == '__main__':
+    main()
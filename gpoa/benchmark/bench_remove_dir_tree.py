@@ -0,0 +1,90 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2026 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+'''
+Compare scandir-based remove_dir_tree with the former pathlib-based
+implementation on the synthetic tree. Run from gpoa directory:
+
+    python3 -m benchmark.bench_remove_dir_tree [--entries N] [--dir DIR]
+'''
+
+import argparse
+import os
+import tempfile
+from pathlib import Path
+
+from frontend.appliers.folder import remove_dir_tree
+from .bench_dconf_registry import measure
+
+
+def remove_dir_tree_pathlib(path, delete_files=False, delete_folder=False, delete_sub_folders=False):
+    '''
+    The implementation remove_dir_tree was replaced with.
+    '''
+    content = list()
+    for entry in path.iterdir():
+        content.append(entry)
+        if entry.is_file() and delete_files:
+            entry.unlink()
+            content.remove(entry)
+        if entry.is_dir() and delete_sub_folders:
+            content.remove(entry)
+            content.extend(remove_dir_tree_pathlib(entry, delete_files, delete_folder, delete_sub_folders))
+
+    if delete_folder and not content:
+        path.rmdir()
+
+    return content
+
+
+def make_tree(root, entries, files_per_dir=100):
+    '''
+    Build the tree resembling user profile: directories with many files
+    nested a few levels deep.
+    '''
+    dirs = max(1, entries // files_per_dir)
+    for dnum in range(dirs):
+        dirname = root / 'd{}'.format(dnum % 10) / 'd{}'.format(dnum // 10 % 10) / 'd{}'.format(dnum)
+        dirname.mkdir(parents=True, exist_ok=True)
+        for fnum in range(files_per_dir):
+            fd = os.open(dirname / 'f{}'.format(fnum), os.O_CREAT | os.O_WRONLY, 0o644)
+            os.close(fd)
+
+
+def run(entries, workdir):
+    with tempfile.TemporaryDirectory(dir=workdir) as tmpdir:
+        for name, func in [
+              ('pathlib remove_dir_tree', remove_dir_tree_pathlib)
+            , ('scandir remove_dir_tree', remove_dir_tree)
+        ]:
+            root = Path(tmpdir) / 'tree'
+            make_tree(root, entries)
+            measure(name, lambda: func(root, True, True, True))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='remove_dir_tree benchmark')
+    parser.add_argument('--entries', type=int, default=100000,
+        help='Number of files in the tree')
+    parser.add_argument('--dir', default=None,
+        help='Directory to create the tree in')
+    args = parser.parse_args()
+    run(args.entries, args.dir)
+
+if __name__ == '__main__':
+    main()
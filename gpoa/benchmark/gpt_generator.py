@@ -0,0 +1,227 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2026 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+'''
+Generator of synthetic GPT trees in the layout gpt.gpt expects:
+
+    <root>/{GUID}/Machine/Registry.pol
+    <root>/{GUID}/Machine/Preferences/<Name>/<Name>.xml
+    <root>/{GUID}/User/Registry.pol
+    <root>/{GUID}/User/Preferences/<Name>/<Name>.xml
+
+Registry.pol files are written in PReg binary format so no Samba is
+needed to generate them.
+'''
+
+import os
+import struct
+import uuid
+from xml.etree import ElementTree
+
+
+REG_SZ = 1
+REG_DWORD = 4
+
+preg_signature = b'PReg'
+preg_version = 1
+
+def encode_preg_string(value):
+    return (value + '\x00').encode('utf-16-le')
+
+def encode_preg_entry(keyname, valuename, vtype, data):
+    '''
+    Encode single [key;value;type;size;data] PReg entry
+    '''
+    if vtype == REG_DWORD:
+        payload = struct.pack('<I', data)
+    else:
+        payload = encode_preg_string(str(data))
+    separator = ';'.encode('utf-16-le')
+    return b''.join([
+          '['.encode('utf-16-le')
+        , encode_preg_string(keyname)
+        , separator
+        , encode_preg_string(valuename)
+        , separator
+        , struct.pack('<I', vtype)
+        , separator
+        , struct.pack('<I', len(payload))
+        , separator
+        , payload
+        , ']'.encode('utf-16-le')
+    ])
+
+def write_preg(path, entries):
+    '''
+    Write Registry.pol file.
+
+    :entries: Iterable of (keyname, valuename, type, data) tuples
+    '''
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(preg_signature + struct.pack('<I', preg_version))
+        for entry in entries:
+            f.write(encode_preg_entry(*entry))
+
+def write_preferences(path, root_tag, item_tag, items):
+    '''
+    Write Group Policy Preferences XML file.
+
+    :items: List of (name, properties) tuples
+    '''
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    root = ElementTree.Element(root_tag, {'clsid': '{' + str(uuid.uuid4()).upper() + '}'})
+    for name, properties in items:
+        item = ElementTree.SubElement(root, item_tag, {
+              'clsid': '{' + str(uuid.uuid4()).upper() + '}'
+            , 'name': name
+            , 'status': name
+            , 'image': '2'
+            , 'changed': '2026-01-01 00:00:00'
+            , 'uid': '{' + str(uuid.uuid4()).upper() + '}'
+        })
+        ElementTree.SubElement(item, 'Properties', properties)
+    ElementTree.ElementTree(root).write(path, encoding='utf-8', xml_declaration=True)
+
+
+class gpt_generator:
+    '''
+    Build the set of synthetic GPOs. Policies of different GPOs overlap
+    partially so merging has to override values like it does for real
+    domains. Preference targets are placed under target_root.
+    '''
+    def __init__(self, root, target_root, gpos=10, preg_entries=500, pref_entries=20, file_size=4096):
+        self.root = root
+        self.target_root = target_root
+        self.gpos = gpos
+        self.preg_entries = preg_entries
+        self.pref_entries = pref_entries
+        self.file_size = file_size
+        self.sources_dir = os.path.join(root, 'sources')
+
+    def machine_preg_entries(self, gpo_num):
+        for num in range(self.preg_entries):
+            # Half of the values are shared by all GPOs
+            vnum = num if num % 2 else num + gpo_num * self.preg_entries
+            kind = num % 5
+            if kind == 0:
+                yield ('Software\\Policies\\Google\\Chrome', 'Policy{}'.format(vnum), REG_DWORD, num % 2)
+            elif kind == 1:
+                yield ('Software\\Policies\\Google\\Chrome\\URLBlocklist', str(vnum),
+                    REG_SZ, 'https://example{}.com/*'.format(vnum))
+            elif kind == 2:
+                yield ('Software\\Policies\\Mozilla\\Firefox', 'Policy{}'.format(vnum), REG_DWORD, 1)
+            elif kind == 3:
+                yield ('Software\\Policies\\Mozilla\\Firefox\\Homepage', 'URL{}'.format(vnum),
+                    REG_SZ, 'https://example.com/{}'.format(vnum))
+            else:
+                yield ('Software\\BaseALT\\Policies\\Bench\\Branch{}'.format(vnum % 20),
+                    'Value{}'.format(vnum), REG_SZ, 'data{}'.format(vnum))
+
+    def user_preg_entries(self, gpo_num):
+        for num in range(self.preg_entries // 2):
+            vnum = num if num % 2 else num + gpo_num * self.preg_entries
+            yield ('Software\\BaseALT\\Policies\\gsettings', 'org.bench.key{}'.format(vnum),
+                REG_SZ, 'value{}'.format(vnum))
+
+    def make_source_files(self):
+        os.makedirs(self.sources_dir, exist_ok=True)
+        content = os.urandom(self.file_size)
+        for num in range(self.pref_entries):
+            with open(os.path.join(self.sources_dir, 'file{}.bin'.format(num)), 'wb') as f:
+                f.write(content)
+
+    def files_items(self, gpo_num):
+        for num in range(self.pref_entries):
+            yield ('file{}'.format(num), {
+                  'action': 'U'
+                , 'fromPath': os.path.join(self.sources_dir, 'file{}.bin'.format(num))
+                , 'targetPath': os.path.join(self.target_root, 'files',
+                    'gpo{}'.format(gpo_num), 'file{}.bin'.format(num))
+            })
+
+    def inifiles_items(self, gpo_num):
+        for num in range(self.pref_entries):
+            yield ('ini{}'.format(num), {
+                  'action': 'U'
+                , 'path': os.path.join(self.target_root, 'ini', 'file{}.ini'.format(num % 5))
+                , 'section': 'Section{}'.format(num % 3)
+                , 'property': 'key{}'.format(num)
+                , 'value': 'gpo{}'.format(gpo_num)
+            })
+
+    def envvars_items(self, gpo_num):
+        for num in range(self.pref_entries):
+            yield ('BENCH_VAR{}'.format(num), {
+                  'action': 'U'
+                , 'name': 'BENCH_VAR{}'.format(num)
+                , 'value': '/opt/bench/gpo{}/{}'.format(gpo_num, num)
+            })
+
+    def shortcuts_items(self, gpo_num):
+        for num in range(self.pref_entries):
+            yield ('Shortcut{}'.format(num), {
+                  'action': 'U'
+                , 'shortcutPath': '%StartMenuDir%\\shortcut{}'.format(num)
+                , 'targetPath': '/usr/bin/bench{}'.format(num)
+                , 'targetType': 'FILESYSTEM'
+                , 'arguments': '--gpo {}'.format(gpo_num)
+            })
+
+    def drives_items(self, gpo_num):
+        for num in range(self.pref_entries):
+            yield ('Drive{}'.format(num), {
+                  'action': 'U'
+                , 'path': '\\\\server{}\\share{}'.format(gpo_num, num)
+                , 'letter': chr(ord('D') + num % 20)
+                , 'label': 'Share{}'.format(num)
+                , 'persistent': '1'
+                , 'useLetter': '1'
+            })
+
+    def generate_gpo(self, gpo_num):
+        gpo_path = os.path.join(self.root, '{' + str(uuid.UUID(int=gpo_num + 1)).upper() + '}')
+        machine = os.path.join(gpo_path, 'Machine')
+        user = os.path.join(gpo_path, 'User')
+        write_preg(os.path.join(machine, 'Registry.pol'), self.machine_preg_entries(gpo_num))
+        write_preg(os.path.join(user, 'Registry.pol'), self.user_preg_entries(gpo_num))
+
+        preferences = [
+              (machine, 'Files', 'Files', 'File', self.files_items)
+            , (machine, 'IniFiles', 'IniFiles', 'Ini', self.inifiles_items)
+            , (machine, 'EnvironmentVariables', 'EnvironmentVariables', 'EnvironmentVariable', self.envvars_items)
+            , (machine, 'Shortcuts', 'Shortcuts', 'Shortcut', self.shortcuts_items)
+            , (user, 'Drives', 'Drives', 'Drive', self.drives_items)
+        ]
+        for base, name, root_tag, item_tag, items in preferences:
+            path = os.path.join(base, 'Preferences', name, '{}.xml'.format(name))
+            write_preferences(path, root_tag, item_tag, list(items(gpo_num)))
+
+        return gpo_path
+
+    def generate(self):
+        '''
+        Generate the tree and return the list of GPO paths in the order
+        they are to be applied.
+        '''
+        self.make_source_files()
+        # Directories Ini files and shortcuts are placed in exist on real systems
+        for name in ('ini', 'applications'):
+            os.makedirs(os.path.join(self.target_root, name), exist_ok=True)
+        return [self.generate_gpo(gpo_num) for gpo_num in range(self.gpos)]
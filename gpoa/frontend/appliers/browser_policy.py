@@ -0,0 +1,150 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2026 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import json
+
+from util.logging import log
+from util.util import (
+      string_to_literal_eval
+    , write_file_if_changed
+)
+
+
+def decode_policy_data(data):
+    '''
+    Registry strings may come as raw UTF-16 bytes.
+    '''
+    if type(data) is bytes:
+        return data.decode(encoding='utf-16').replace('\x00', '')
+    return data
+
+def get_boolean(data):
+    if data in ['0', 'false', None, 'none', 0]:
+        return False
+    if data in ['1', 'true', 1]:
+        return True
+
+class policy_tree:
+    '''
+    Nested dictionary of browser policies built from registry paths
+    relative to the browser's registry branch.
+    '''
+    def __init__(self, registry_branch):
+        self.registry_branch = registry_branch
+        self.root = dict()
+
+    def get_parts(self, hivekeyname):
+        '''
+        Split registry path into policy path components
+        '''
+        if hivekeyname.startswith(self.registry_branch):
+            return hivekeyname[len(self.registry_branch):].split('/')
+        return hivekeyname.replace(self.registry_branch, '').split('/')
+
+    def get_branch(self, parts):
+        branch = self.root
+        for part in parts[:-1]:
+            branch = branch.setdefault(part, {})
+        return branch
+
+    def set(self, hivekeyname, value):
+        parts = self.get_parts(hivekeyname)
+        self.get_branch(parts)[parts[-1]] = value
+
+    def append(self, keyname, value):
+        parts = self.get_parts(keyname)
+        branch = self.get_branch(parts)
+        if branch.get(parts[-1]) is None:
+            branch[parts[-1]] = list()
+        branch[parts[-1]].append(value)
+
+def chromium_policy_value(entry, valuename_typeint):
+    '''
+    Convert registry value to the type expected by Chromium-based browsers.
+
+    :valuename_typeint: Set of DWORD policy names to be treated as integers
+    instead of booleans
+    '''
+    data = entry.data
+    if entry.type == 4:
+        if entry.valuename in valuename_typeint:
+            return int(data)
+        return get_boolean(data)
+    if data[0] == '[' and data[-1] == ']':
+        try:
+            return json.loads(str(data))
+        except:
+            pass
+    return str(data).replace('\\', '/')
+
+def build_chromium_policies(registry_branch, keys, valuename_typeint):
+    '''
+    Collect dictionaries from registry keys into a general dictionary
+    '''
+    tree = policy_tree(registry_branch)
+    for it_data in keys:
+        try:
+            it_data.data = decode_policy_data(it_data.data)
+            tree.set(it_data.hive_key, chromium_policy_value(it_data, valuename_typeint))
+        except Exception as exc:
+            logdata = dict()
+            logdata['Exception'] = exc
+            logdata['keyname'] = it_data.keyname
+            log('D178', logdata)
+    return tree.root.get('', {})
+
+def chromium_policies_json(policies):
+    '''
+    Replacing all nested dictionaries with a list. Only strings may hold
+    literals so the rest of values are taken as is.
+    '''
+    result = dict()
+    for key, val in policies.items():
+        if type(val) == dict:
+            result[key] = [*val.values()]
+        elif type(val) == str:
+            result[key] = string_to_literal_eval(val)
+        else:
+            result[key] = val
+    return result
+
+def write_policies_json(destfile, policies, log_code):
+    '''
+    Atomically replace policies.json in case its content changed.
+
+    :return: True in case the file was written
+    '''
+    logdata = dict()
+    logdata['destfile'] = destfile
+    if write_file_if_changed(destfile, json.dumps(policies)):
+        log(log_code, logdata)
+        return True
+    log('D230', logdata)
+    return False
+
+def write_chromium_policies(policies, managed_path, recommended_path, log_code):
+    '''
+    Split policies into managed and recommended ones and write them.
+    '''
+    policies = dict(policies)
+    recommended = policies.pop('Recommended', {})
+    write_policies_json('{}/policies.json'.format(managed_path),
+        chromium_policies_json(policies), log_code)
+    write_policies_json('{}/policies.json'.format(recommended_path),
+        chromium_policies_json(recommended), log_code)
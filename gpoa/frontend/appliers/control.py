@@ -16,10 +16,17 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import json
+import os
+import re
 import subprocess
 import threading
 import logging
+from concurrent.futures import ThreadPoolExecutor
+
 from util.logging import slogm, log
+from util.paths import cache_dir
+from util.util import read_file_if_exists, write_file_if_changed
 
 def control_subst(preg_name):
     '''
@@ -37,12 +44,134 @@ def control_subst(preg_name):
 
     return result
 
+class control_facilities:
+    '''
+    Access to ALT control facilities. Possible values of facilities are
+    cached across runs and invalidated by modification time of facility
+    script. Current states are queried once per run and facilities are
+    switched only when their state differs from the requested one.
+    '''
+    __control = '/usr/sbin/control'
+    __facilities_dir = '/etc/control.d/facilities'
+    __cache_file_name = 'control_values.json'
+    __max_workers = 4
+
+    def __init__(self):
+        self.cache_file = os.path.join(cache_dir(), self.__cache_file_name)
+        self.values_cache = dict()
+        self.cache_changed = False
+        self.statuses = dict()
+        try:
+            self.values_cache = json.loads(read_file_if_exists(self.cache_file) or '{}')
+        except ValueError:
+            pass
+
+    def _script_mtime(self, name):
+        try:
+            return os.stat(os.path.join(self.__facilities_dir, name)).st_mtime_ns
+        except OSError:
+            return None
+
+    def _query_values(self, name):
+        popen_call = [self.__control, name, 'list']
+        with subprocess.Popen(popen_call, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as proc:
+            values = proc.stdout.readline().decode('utf-8').split()
+            valErr = proc.stderr.readline().decode('utf-8')
+            if valErr:
+                raise ValueError(valErr)
+            proc.wait()
+        return values
+
+    def get_values(self, name):
+        '''
+        Get possible values of control facility
+        '''
+        mtime = self._script_mtime(name)
+        cached = self.values_cache.get(name)
+        if mtime and cached and cached.get('mtime') == mtime:
+            return cached['values']
+
+        values = self._query_values(name)
+        if mtime:
+            self.values_cache[name] = {'mtime': mtime, 'values': values}
+            self.cache_changed = True
+        return values
+
+    def get_status(self, name):
+        '''
+        Get current state of control facility
+        '''
+        if name not in self.statuses:
+            popen_call = [self.__control, name]
+            with subprocess.Popen(popen_call, stdout=subprocess.PIPE) as proc:
+                line = proc.stdout.readline().decode('utf-8').rstrip('\n\r')
+                proc.wait()
+            self.statuses[name] = line
+        return self.statuses[name]
+
+    def fetch_statuses(self, names):
+        '''
+        Query current states of all specified facilities concurrently
+        '''
+        names = [name for name in set(names) if name not in self.statuses]
+        if not names:
+            return
+        with ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            list(executor.map(self.get_status, names))
+
+    def set_status(self, name, status):
+        popen_call = [self.__control, name, status]
+        with subprocess.Popen(popen_call, stdout=subprocess.PIPE) as proc:
+            proc.wait()
+        self.statuses[name] = status
+
+    def get_config(self, name):
+        '''
+        Get configuration file changed by facility script. Facilities
+        changing the same file can't be switched concurrently.
+        '''
+        script = read_file_if_exists(os.path.join(self.__facilities_dir, name))
+        if script:
+            match = re.search(r'^\s*CONFIG=["\']?([^"\'\s]+)', script, re.M)
+            if match:
+                return match.group(1)
+        return None
+
+    def set_controls(self, controls):
+        '''
+        Switch facilities to requested states. Facilities changing
+        different configuration files are switched concurrently while
+        the ones with the same or unknown configuration file are
+        switched sequentially in policy order.
+        '''
+        self.fetch_statuses([cont.get_control_name() for cont in controls])
+        groups = dict()
+        for cont in controls:
+            groups.setdefault(self.get_config(cont.get_control_name()), list()).append(cont)
+
+        def set_group(group):
+            for cont in group:
+                cont.set_control_status()
+
+        with ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            list(executor.map(set_group, groups.values()))
+
+    def save(self):
+        '''
+        Save possible values of facilities for next runs
+        '''
+        if self.cache_changed:
+            write_file_if_changed(self.cache_file, json.dumps(self.values_cache))
+            self.cache_changed = False
+
+
 class control:
-    def __init__(self, name, value):
+    def __init__(self, name, value, facilities=None):
         if type(value) != int and type(value) != str:
             raise Exception('Unknown type of value for control')
         self.control_name = control_subst(name)
         self.control_value = value
+        self.facilities = facilities if facilities else control_facilities()
         self.possible_values = self._query_control_values()
         if self.possible_values == None:
             raise Exception('Unable to query possible values')
@@ -52,16 +181,7 @@ class control:
         Query possible values from control in order to perform check of
         parameter passed to constructor.
         '''
-        values = list()
-
-        popen_call = ['/usr/sbin/control', self.control_name, 'list']
-        with subprocess.Popen(popen_call, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as proc:
-            values = proc.stdout.readline().decode('utf-8').split()
-            valErr = proc.stderr.readline().decode('utf-8')
-            if valErr:
-                raise ValueError(valErr)
-            proc.wait()
-        return values
+        return self.facilities.get_values(self.control_name)
 
     def _map_control_status(self, int_status):
         '''
@@ -86,43 +206,43 @@ class control:
         '''
         Get current control value
         '''
-        line = None
-
-        popen_call = ['/usr/sbin/control', self.control_name]
-        with subprocess.Popen(popen_call, stdout=subprocess.PIPE) as proc:
-            line = proc.stdout.readline().decode('utf-8').rstrip('\n\r')
-            proc.wait()
-
-        return line
+        return self.facilities.get_status(self.control_name)
 
-    def set_control_status(self):
+    def get_requested_status(self):
+        '''
+        Get control's string value requested by policy
+        '''
+        status = None
         if type(self.control_value) == int:
             status = self._map_control_status(self.control_value)
             if status == None:
                 logdata = dict()
                 logdata['control'] = self.control_name
-                logdata['inpossible values'] = self.self.control_value
+                logdata['inpossible values'] = self.control_value
                 log('E42', logdata)
-                return
         elif type(self.control_value) == str:
             if self.control_value not in self.possible_values:
                 logdata = dict()
                 logdata['control'] = self.control_name
-                logdata['inpossible values'] = self.self.control_value
+                logdata['inpossible values'] = self.control_value
                 log('E59', logdata)
-                return
-            status = self.control_value
+            else:
+                status = self.control_value
+        return status
+
+    def set_control_status(self):
+        status = self.get_requested_status()
+        if status == None:
+            return
         logdata = dict()
         logdata['control'] = self.control_name
         logdata['status'] = status
-        log('D68', logdata)
 
         try:
-            popen_call = ['/usr/sbin/control', self.control_name, status]
-            with subprocess.Popen(popen_call, stdout=subprocess.PIPE) as proc:
-                proc.wait()
+            if self.get_control_status() == status:
+                log('D219', logdata)
+                return
+            log('D68', logdata)
+            self.facilities.set_status(self.control_name, status)
         except:
-            logdata = dict()
-            logdata['control'] = self.control_name
-            logdata['status'] = status
             log('E43', logdata)
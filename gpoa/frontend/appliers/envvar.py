@@ -16,7 +16,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from os.path import isfile
+import os
 from util.logging import slogm
 import logging
 
@@ -27,60 +27,82 @@ from gpt.envvars import (
 from util.windows import expand_windows_var
 from util.util import (
         get_homedir,
-        homedir_exists
+        homedir_exists,
+        read_file_if_exists,
+        write_file_if_changed
 )
 
+system_envvar_file = '/etc/gpupdate/environment'
+user_envvar_file_name = '.gpupdate_environment'
+
+class envvar_file:
+    '''
+    pam_env style environment file with lines like 'NAME DEFAULT="value"'
+    indexed by variable name. Lines of removed variables are replaced
+    with None so all edits take constant time and unrelated lines keep
+    their order.
+    '''
+    def __init__(self, filename):
+        self.filename = filename
+        self.content = read_file_if_exists(filename)
+        self.lines = list()
+        self.index = dict()
+        if self.content:
+            for line in self.content.splitlines(keepends=True):
+                self._append(line)
+
+    def _append(self, line):
+        fields = line.split()
+        if fields:
+            self.index.setdefault(fields[0], list()).append(len(self.lines))
+        self.lines.append(line)
+
+    def get_value(self, name):
+        '''
+        Get value of the first definition of the variable or None.
+        '''
+        positions = self.index.get(name)
+        if not positions:
+            return None
+        fields = self.lines[positions[0]].split(None, 1)
+        value = fields[1].strip() if len(fields) > 1 else ''
+        return value.partition('=')[2].replace('"', '')
+
+    def delete(self, name):
+        positions = self.index.get(name)
+        if not positions:
+            return False
+        self.lines[positions.pop(0)] = None
+        return True
+
+    def set(self, name, value):
+        '''
+        Replace the first definition of the variable with the new one
+        placed at the end of the file.
+        '''
+        self.delete(name)
+        self._append('{} DEFAULT="{}"\n'.format(name, value))
+
+    def render(self):
+        return ''.join(line for line in self.lines if line is not None)
+
+    def write(self):
+        mode = 0o644
+        if self.content is not None:
+            mode = os.stat(self.filename).st_mode & 0o777
+        return write_file_if_changed(self.filename, self.render(), mode)
+
 class Envvar:
     def __init__(self, envvars, username=''):
         self.username = username
         self.envvars = envvars
         if self.username == 'root':
-            self.envvar_file_path = '/etc/gpupdate/environment'
-        else:
-            self.envvar_file_path = get_homedir(self.username) + '/.gpupdate_environment'
-
-    def _open_envvar_file(self):
-        fd = None
-        if isfile(self.envvar_file_path):
-            fd = open(self.envvar_file_path, 'r+')
+            self.envvar_file_path = system_envvar_file
         else:
-            fd = open(self.envvar_file_path, 'w')
-            fd.close()
-            fd = open(self.envvar_file_path, 'r+')
-        return fd
-
-    def _create_action(self, create_dict, envvar_file):
-        lines_old = envvar_file.readlines()
-        lines_new = list()
-        for name in create_dict:
-            exist = False
-            for line in lines_old:
-                if line.startswith(name + '='):
-                    exist = True
-                    break
-            if not exist:
-                lines_new.append(name + '=' + create_dict[name] + '\n')
-        if len(lines_new) > 0:
-            envvar_file.writelines(lines_new)
-
-    def _delete_action(self, delete_dict, envvar_file):
-        lines = envvar_file.readlines()
-        deleted = False
-        for name in delete_dict:
-            for line in lines:
-                if line.startswith(name + '='):
-                    lines.remove(line)
-                    deleted = True
-                    break
-        if deleted:
-            envvar_file.writelines(lines)
+            self.envvar_file_path = os.path.join(get_homedir(self.username), user_envvar_file_name)
 
     def act(self):
-        if isfile(self.envvar_file_path):
-            with open(self.envvar_file_path, 'r') as f:
-                lines = f.readlines()
-        else:
-            lines = list()
+        envvars = envvar_file(self.envvar_file_path)
 
         file_changed = False
         for envvar_object in self.envvars:
@@ -90,31 +112,17 @@ class Envvar:
             if value != envvar_object.value:
                 #slashes are replaced only if the change of variables was performed and we consider the variable as a path to a file or directory
                 value = value.replace('\\', '/')
-            exist_line = None
-            for line in lines:
-                if line == '\n':
-                    continue
-                if line.split()[0] == name:
-                    exist_line = line
-                    break
-            if exist_line != None:
-                if action == FileAction.CREATE:
-                    pass
-                if action == FileAction.DELETE:
-                    lines.remove(exist_line)
-                    file_changed = True
-                if action == FileAction.UPDATE or action == FileAction.REPLACE:
-                    if exist_line.split()[1].split('=')[1].replace('"', '') != value: #from 'NAME DEFAULT=value' cut value and compare, don`t change if it matches
-                        lines.remove(exist_line)
-                        lines.append(name + ' ' + 'DEFAULT=\"' + value + '\"\n')
-                        file_changed = True
-            else:
-                if action == FileAction.CREATE or action == FileAction.UPDATE or action == FileAction.REPLACE:
-                    lines.append(name + ' ' + 'DEFAULT=\"' + value + '\"\n')
+            exist_value = envvars.get_value(name)
+            if action == FileAction.DELETE:
+                file_changed |= envvars.delete(name)
+            elif action == FileAction.CREATE:
+                if exist_value is None:
+                    envvars.set(name, value)
                     file_changed = True
-                if action == FileAction.DELETE:
-                    pass
+            elif exist_value != value:
+                # UPDATE and REPLACE don't change the matching value
+                envvars.set(name, value)
+                file_changed = True
 
         if file_changed:
-            with open(self.envvar_file_path, 'w') as f:
-                f.writelines(lines)
+            envvars.write()
@@ -24,12 +24,18 @@ from gpt.folders import (
 from .folder import str2bool
 from util.logging import log
 import shutil
+import pwd
 from pathlib import Path
 from util.windows import expand_windows_var
-from util.util import get_homedir
+from util.util import (
+      get_homedir
+    , copy_file_if_changed
+)
 from util.exceptions import NotUNCPathError
 from util.paths import UNCPath
 import fnmatch
+import time
+from concurrent.futures import ThreadPoolExecutor
 
 class Files_cp:
     def __init__(self, file_obj, file_cache, exe_check, username=None):
@@ -54,7 +60,6 @@ class Files_cp:
             if targetPath[-1] == '/' or self.is_pattern(Path(self.fromPath).name):
                 self.isTargetPathDirectory = True
             self.get_list_files()
-        self.act()
 
     def get_target_file(self, targetPath:Path, fromFile:str) -> Path:
         try:
@@ -85,20 +90,33 @@ class Files_cp:
 
         return None
 
-    def copy_target_file(self, targetFile:Path, fromFile:str):
+    def copy_target_file(self, targetFile:Path, fromFile:str) -> bool:
+        '''
+        Copy the file setting its owner and mode. Local files are copied
+        only in case the target differs from the source.
+
+        :return: True in case the target file was written
+        '''
         try:
             uri_path = UNCPath(fromFile)
             self.file_cache.store(fromFile, targetFile)
+            if self.username:
+                shutil.chown(targetFile, self.username)
+            self.set_mod_file(targetFile, fromFile)
+            return True
         except NotUNCPathError as exc:
             fromFilePath = Path(fromFile)
             if fromFilePath.exists():
-                targetFile.write_bytes(fromFilePath.read_bytes())
+                uid = pwd.getpwnam(self.username).pw_uid if self.username else -1
+                return copy_file_if_changed(fromFilePath, targetFile,
+                    self.get_mod_file(targetFile, fromFile), uid)
         except Exception as exc:
             logdata = dict()
             logdata['targetFile'] = targetFile
             logdata['fromFile'] = fromFile
             logdata['exc'] = exc
             log('W15', logdata)
+        return False
 
     def set_exe_file(self, targetFile, fromFile):
         if self.executable:
@@ -110,88 +128,71 @@ class Files_cp:
                     return True
         return False
 
+    def get_mod_file(self, targetFile, fromFile):
+        if self.set_exe_file(targetFile, fromFile):
+            return 0o555 if self.readOnly else 0o755
+        return 0o444 if self.readOnly else 0o644
+
     def set_mod_file(self, targetFile, fromFile):
         if not targetFile.is_file():
             return
-        if self.set_exe_file(targetFile, fromFile):
-            if self.readOnly:
-                shutil.os.chmod(targetFile, 0o555)
-            else:
-                shutil.os.chmod(targetFile, 0o755)
-        else:
-            if self.readOnly:
-                shutil.os.chmod(targetFile, 0o444)
-            else:
-                shutil.os.chmod(targetFile, 0o644)
+        shutil.os.chmod(targetFile, self.get_mod_file(targetFile, fromFile))
+
+    def create_file(self, targetFile, fromFile):
+        if not targetFile.exists():
+            self.copy_target_file(targetFile, fromFile)
+            logdata = dict()
+            logdata['File'] = targetFile
+            log('D191', logdata)
 
-    def _create_action(self):
+    def update_file(self, targetFile, fromFile):
         logdata = dict()
-        for fromFile in self.fromPathFiles:
-            targetFile = None
+        logdata['File'] = targetFile
+        if self.copy_target_file(targetFile, fromFile):
+            log('D192', logdata)
+        else:
+            log('D223', logdata)
 
-            try:
-                targetFile = self.get_target_file(self.targetPath, fromFile)
-                if targetFile and not targetFile.exists():
-                    self.copy_target_file(targetFile, fromFile)
-                    if self.username:
-                        shutil.chown(targetFile, self.username)
-                    self.set_mod_file(targetFile, fromFile)
-                    logdata['File'] = targetFile
-                    log('D191', logdata)
-            except Exception as exc:
-                logdata['exc'] = exc
-                logdata['fromPath'] = fromFile
-                logdata['targetPath'] = self.targetPath
-                logdata['targetFile'] = targetFile
-                log('D164', logdata)
+    def delete_file(self, targetFile, fromFile=None):
+        # Patterns are expanded when the operation runs so the files
+        # created by the preceding entries are deleted too
+        targets = [targetFile]
+        if self.is_pattern(targetFile.name):
+            targets = self.get_delete_targets()
+        for target in targets:
+            if target.exists():
+                target.unlink()
+                logdata = dict()
+                logdata['File'] = target
+                log('D193', logdata)
 
-    def _delete_action(self):
+    def get_delete_targets(self):
         list_target = [self.targetPath.name]
         if self.is_pattern(self.targetPath.name) and self.targetPath.parent.exists() and self.targetPath.parent.is_dir():
             list_target = fnmatch.filter([str(x.name) for x in self.targetPath.parent.iterdir() if x.is_file()], self.targetPath.name)
-        logdata = dict()
-        for targetFile in list_target:
-            targetFile = self.targetPath.parent.joinpath(targetFile)
-            try:
-                if targetFile.exists():
-                    targetFile.unlink()
-                    logdata['File'] = targetFile
-                    log('D193', logdata)
-
-            except Exception as exc:
-                logdata['exc'] = exc
-                logdata['targetPath'] = self.targetPath
-                logdata['targetFile'] = targetFile
-                log('D165', logdata)
+        return [self.targetPath.parent.joinpath(targetFile) for targetFile in list_target]
 
-    def _update_action(self):
-        logdata = dict()
-        for fromFile in self.fromPathFiles:
-            targetFile = self.get_target_file(self.targetPath, fromFile)
-            try:
-                self.copy_target_file(targetFile, fromFile)
-                if self.username:
-                    shutil.chown(self.targetPath, self.username)
-                self.set_mod_file(targetFile, fromFile)
-                logdata['File'] = targetFile
-                log('D192', logdata)
-            except Exception as exc:
-                logdata['exc'] = exc
-                logdata['fromPath'] = self.fromPath
-                logdata['targetPath'] = self.targetPath
-                logdata['targetFile'] = targetFile
-                log('D166', logdata)
+    def plan(self):
+        '''
+        Expand the entry into the list of single file operations in the
+        order they must be run.
+        '''
+        operations = list()
+        if not self.targetPath:
+            return operations
+        if self.action in [FileAction.DELETE, FileAction.REPLACE]:
+            operations.append(file_operation(self, FileAction.DELETE, self.targetPath))
+        if self.action in [FileAction.CREATE, FileAction.REPLACE, FileAction.UPDATE]:
+            action = FileAction.UPDATE if self.action == FileAction.UPDATE else FileAction.CREATE
+            for fromFile in self.fromPathFiles:
+                targetFile = self.get_target_file(self.targetPath, fromFile)
+                if targetFile:
+                    operations.append(file_operation(self, action, targetFile, fromFile))
+        return operations
 
     def act(self):
-        if self.action == FileAction.CREATE:
-            self._create_action()
-        if self.action == FileAction.UPDATE:
-            self._update_action()
-        if self.action == FileAction.DELETE:
-            self._delete_action()
-        if self.action == FileAction.REPLACE:
-            self._delete_action()
-            self._create_action()
+        for operation in self.plan():
+            operation.run()
 
     def is_pattern(self, name):
         if name.find('*') != -1 or name.find('?') != -1:
@@ -229,6 +230,146 @@ class Files_cp:
                 logdata['exc'] = exc
                 log('W3317', logdata)
 
+class file_operation:
+    '''
+    Single file copy or removal expanded from Files.xml entry.
+    '''
+    __error_codes = {
+          FileAction.CREATE: 'D164'
+        , FileAction.UPDATE: 'D166'
+        , FileAction.DELETE: 'D165'
+    }
+
+    def __init__(self, files_cp, action, targetFile, fromFile=None):
+        self.files_cp = files_cp
+        self.action = action
+        self.targetFile = targetFile
+        self.fromFile = fromFile
+        self.error = None
+        self.elapsed = 0
+
+    def key(self):
+        return (self.action, str(self.targetFile), self.fromFile)
+
+    def is_barrier(self):
+        '''
+        Deletion by pattern may touch any file in the directory so it is
+        ordered against all the other operations.
+        '''
+        return self.action == FileAction.DELETE and self.files_cp.is_pattern(self.targetFile.name)
+
+    def run(self):
+        '''
+        :return: True in case the operation succeeded
+        '''
+        handlers = {
+              FileAction.CREATE: self.files_cp.create_file
+            , FileAction.UPDATE: self.files_cp.update_file
+            , FileAction.DELETE: self.files_cp.delete_file
+        }
+        start = time.perf_counter()
+        try:
+            handlers[self.action](self.targetFile, self.fromFile)
+        except Exception as exc:
+            self.error = exc
+            logdata = dict()
+            logdata['exc'] = exc
+            logdata['fromPath'] = self.fromFile
+            logdata['targetPath'] = self.files_cp.targetPath
+            logdata['targetFile'] = self.targetFile
+            log(self.__error_codes[self.action], logdata)
+        self.elapsed = time.perf_counter() - start
+
+        logdata = dict()
+        logdata['File'] = self.targetFile
+        logdata['action'] = self.action.name
+        logdata['time'] = round(self.elapsed, 3)
+        log('D224', logdata)
+        return self.error is None
+
+class Files_planner:
+    '''
+    Expand all Files.xml entries into the list of file operations and run
+    them on the bounded thread pool. Operations on the same target file
+    are run sequentially in policy order while the independent ones are
+    run concurrently. Deletions by pattern split the operations into
+    stages which are run one after another.
+    '''
+    __max_workers = 8
+
+    def __init__(self, files, file_cache, exe_check, username=None):
+        self.file_cache = file_cache
+        self.exe_check = exe_check
+        self.username = username
+        self.files = files
+        self.errors = list()
+
+    def _expand(self, file_obj):
+        try:
+            return Files_cp(file_obj, self.file_cache, self.exe_check, self.username).plan()
+        except Exception as exc:
+            logdata = dict()
+            logdata['targetPath'] = file_obj.targetPath
+            logdata['fromPath'] = file_obj.fromPath
+            logdata['exc'] = exc
+            log('D164', logdata)
+            return list()
+
+    def plan(self):
+        '''
+        Group deduplicated operations by target keeping policy order.
+
+        :return: List of stages, each stage is the list of chains which
+            may be run concurrently
+        '''
+        with ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            expanded = list(executor.map(self._expand, self.files))
+
+        stages = list()
+        chains = dict()
+        for operations in expanded:
+            for operation in operations:
+                if operation.is_barrier():
+                    if chains:
+                        stages.append(chains)
+                    stages.append({str(operation.targetFile): [operation]})
+                    chains = dict()
+                    continue
+                chain = chains.setdefault(str(operation.targetFile), list())
+                if chain and chain[-1].key() == operation.key():
+                    continue
+                chain.append(operation)
+        if chains:
+            stages.append(chains)
+
+        for chains in stages:
+            for target, chain in chains.items():
+                if len(chain) > 1:
+                    logdata = dict()
+                    logdata['File'] = target
+                    logdata['operations'] = [operation.action.name for operation in chain]
+                    log('D225', logdata)
+
+        return [list(chains.values()) for chains in stages]
+
+    def _run_chain(self, chain):
+        for operation in chain:
+            if not operation.run():
+                self.errors.append(operation)
+
+    def run(self):
+        start = time.perf_counter()
+        stages = self.plan()
+        with ThreadPoolExecutor(max_workers=self.__max_workers) as executor:
+            for chains in stages:
+                list(executor.map(self._run_chain, chains))
+
+        logdata = dict()
+        logdata['operations'] = sum(len(chain) for chains in stages for chain in chains)
+        logdata['errors'] = len(self.errors)
+        logdata['time'] = round(time.perf_counter() - start, 3)
+        log('D226', logdata)
+
 def check_target_path(path_to_check, username = None):
     '''
     Function for checking the correctness of the path
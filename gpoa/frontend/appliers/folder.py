@@ -17,6 +17,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
+import os
 from pathlib import Path
 
 
@@ -28,18 +29,57 @@ from util.windows import expand_windows_var
 from util.util import get_homedir
 
 def remove_dir_tree(path, delete_files=False, delete_folder=False, delete_sub_folders=False):
+    '''
+    Clean up the directory tree iteratively. Entries are removed relative
+    to the opened directory descriptors and the type information comes
+    from scandir() so no additional stat() calls and path lookups are
+    made. The root itself may be a symbolic link to the directory, the
+    symbolic links below it are never followed and are treated as files.
+
+    :delete_files: Remove files
+    :delete_sub_folders: Descend into the subdirectories
+    :delete_folder: Remove the directories which became empty
+
+    :return: List of entries left in the tree
+    '''
     content = list()
-    for entry in path.iterdir():
-        content.append(entry)
-        if entry.is_file() and delete_files:
-            entry.unlink()
-            content.remove(entry)
-        if entry.is_dir() and delete_sub_folders:
-            content.remove(entry)
-            content.extend(remove_dir_tree(entry, delete_files, delete_folder, delete_sub_folders))
-
-    if delete_folder and not content:
-        path.rmdir()
+    dir_flags = os.O_RDONLY | os.O_DIRECTORY | os.O_NOFOLLOW
+    root_fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    # Stack frames are [dir_fd, dir_path, scandir_iterator, kept_entries]
+    stack = [[root_fd, Path(path), os.scandir(root_fd), 0]]
+    try:
+        while stack:
+            frame = stack[-1]
+            dir_fd, dir_path, entries, _ = frame
+            entry = next(entries, None)
+            if entry is None:
+                stack.pop()
+                entries.close()
+                os.close(dir_fd)
+                if stack:
+                    parent = stack[-1]
+                    if delete_folder and not frame[3]:
+                        os.rmdir(dir_path.name, dir_fd=parent[0])
+                    parent[3] += frame[3]
+                elif delete_folder and not frame[3]:
+                    os.rmdir(os.path.realpath(path))
+                continue
+
+            if entry.is_dir(follow_symlinks=False):
+                if delete_sub_folders:
+                    subdir_fd = os.open(entry.name, dir_flags, dir_fd=dir_fd)
+                    stack.append([subdir_fd, dir_path / entry.name, os.scandir(subdir_fd), 0])
+                    continue
+            elif delete_files and (entry.is_file(follow_symlinks=False) or entry.is_symlink()):
+                os.unlink(entry.name, dir_fd=dir_fd)
+                continue
+
+            frame[3] += 1
+            content.append(dir_path / entry.name)
+    finally:
+        for dir_fd, _, entries, _ in stack:
+            entries.close()
+            os.close(dir_fd)
 
     return content
 
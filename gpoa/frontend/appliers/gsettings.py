@@ -17,11 +17,14 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 import configparser
+import io
 import os
 import logging
 from gi.repository import Gio, GLib
 
 from util.logging import slogm, log
+from util.util import write_file_if_changed
+from util.system import require_session_bus
 
 class system_gsetting:
     def __init__(self, schema, path, value, lock, helper_function=None):
@@ -57,6 +60,8 @@ class system_gsettings:
         self.gsettings = list()
         self.locks = list()
         self.override_file_path = override_file_path
+        self.override_changed = False
+        self.dconf_changed = False
 
     def append(self, schema, path, data, lock, helper):
         if check_existing_gsettings(schema, path):
@@ -70,6 +75,10 @@ class system_gsettings:
             log('D150', logdata)
 
     def apply(self):
+        '''
+        Render GSettings override, locks and dconf profile in memory and
+        replace files on disk only in case their contents differ.
+        '''
         config = configparser.ConfigParser()
 
         for gsetting in self.gsettings:
@@ -82,25 +91,18 @@ class system_gsettings:
             log('D89', logdata)
             gsetting.apply(settings, config, self.locks)
 
-        with open(self.override_file_path, 'w') as f:
-            config.write(f)
+        override_data = io.StringIO()
+        config.write(override_data)
+        locks_data = ''.join(lock + '\n' for lock in self.locks)
 
         os.makedirs(self.__path_local_dir, mode=0o755, exist_ok=True)
         os.makedirs(os.path.dirname(self.__path_locks), mode=0o755, exist_ok=True)
         os.makedirs(os.path.dirname(self.__path_profile), mode=0o755, exist_ok=True)
-        try:
-            os.remove(self.__path_locks)
-        except OSError as error:
-            pass
-
-        file_locks = open(self.__path_locks,'w')
-        for lock in self.locks:
-            file_locks.write(lock +'\n')
-        file_locks.close()
 
-        profile = open(self.__path_profile ,'w')
-        profile.write(self.__profile_data)
-        profile.close()
+        self.override_changed = write_file_if_changed(self.override_file_path, override_data.getvalue())
+        locks_changed = write_file_if_changed(self.__path_locks, locks_data)
+        profile_changed = write_file_if_changed(self.__path_profile, self.__profile_data)
+        self.dconf_changed = locks_changed or profile_changed
 
 def glib_map(value, glib_type):
     result_value = value
@@ -146,6 +148,9 @@ class user_gsettings:
             log('D151', logdata)
 
     def apply(self):
+        if self.gsettings:
+            # GSettings are written with dconf-service over the session bus
+            require_session_bus()
         for gsetting in self.gsettings:
             logdata = dict()
             logdata['gsetting.schema'] = gsetting.schema
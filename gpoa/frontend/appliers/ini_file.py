@@ -18,6 +18,9 @@
 
 
 
+import io
+import os
+
 from gpt.folders import (
       FileAction
     , action_letter2enum
@@ -25,68 +28,122 @@ from gpt.folders import (
 from util.logging import log
 from pathlib import Path
 from util.windows import expand_windows_var
-from util.util import get_homedir
+from util.util import (
+      get_homedir
+    , write_file_if_changed
+)
 from util.gpoa_ini_parsing import GpoaConfigObj
 
 
 class Ini_file:
+    '''
+    Single Ini preference entry with resolved target path.
+    '''
     def __init__(self, ini_obj, username=None):
         path = expand_windows_var(ini_obj.path, username).replace('\\', '/')
         self.path = check_path(path, username)
         if not self.path:
             logdata = {'path': ini_obj.path}
             log('D175', logdata)
-            return None
         self.section = ini_obj.section
         self.action = action_letter2enum(ini_obj.action)
         self.key = ini_obj.property
         self.value = ini_obj.value
-        try:
-            self.config = GpoaConfigObj(str(self.path), unrepr=False)
-        except Exception as exc:
-            logdata = {'exc': exc}
-            log('D176', logdata)
-            return
 
-        self.act()
 
-    def _create_action(self):
+class Ini_target:
+    '''
+    Target ini file which is parsed once, gets all the entries applied in
+    memory and then is written only in case its content changed.
+    '''
+    def __init__(self, path):
+        self.path = path
+        self.exists = path.is_file()
+        self.config = GpoaConfigObj(str(self.path), unrepr=False)
+
+    def _reset_config(self):
+        self.config = GpoaConfigObj(unrepr=False)
+        self.config.filename = str(self.path)
+
+    def _create_action(self, ini_entry):
         if self.path.is_dir():
             return
-        if self.section not in self.config:
-            self.config[self.section] = dict()
-
-        self.config[self.section][self.key] = self.value
-        self.config.write()
+        if ini_entry.section not in self.config:
+            self.config[ini_entry.section] = dict()
 
+        self.config[ini_entry.section][ini_entry.key] = ini_entry.value
+        self.exists = True
 
-    def _delete_action(self):
-        if not self.path.exists() or self.path.is_dir():
+    def _delete_action(self, ini_entry):
+        if not self.exists:
+            return
+        if not ini_entry.section:
+            self._reset_config()
+            self.exists = False
             return
-        if not self.section:
-            self.path.unlink()
+        if ini_entry.section in self.config:
+            if not ini_entry.key:
+                self.config.pop(ini_entry.section)
+            elif ini_entry.key in self.config[ini_entry.section]:
+                self.config[ini_entry.section].pop(ini_entry.key)
+
+    def apply(self, ini_entry):
+        try:
+            if ini_entry.action == FileAction.DELETE:
+                self._delete_action(ini_entry)
+            else:
+                self._create_action(ini_entry)
+        except Exception as exc:
+            logdata = dict()
+            logdata['action'] = ini_entry.action
+            logdata['exc'] = exc
+            log('W23', logdata)
+
+    def save(self):
+        logdata = dict()
+        logdata['path'] = str(self.path)
+        if not self.exists:
+            if self.path.is_file():
+                self.path.unlink()
+                log('D227', logdata)
             return
-        if self.section in self.config:
-            if not self.key:
-                self.config.pop(self.section)
-            elif self.key in self.config[self.section]:
-                self.config[self.section].pop(self.key)
-        self.config.write()
 
+        content = io.BytesIO()
+        self.config.write(outfile=content)
+        mode = 0o644
+        if self.path.exists():
+            mode = os.stat(self.path).st_mode & 0o7777
+        if write_file_if_changed(str(self.path), content.getvalue(), mode):
+            log('D228', logdata)
+        else:
+            log('D229', logdata)
 
-    def act(self):
+
+def apply_ini_files(ini_objects, username=None):
+    '''
+    Group Ini preference entries by target file keeping policy order and
+    apply them file by file.
+    '''
+    targets = dict()
+    for ini_obj in ini_objects:
+        ini_entry = Ini_file(ini_obj, username)
+        if ini_entry.path:
+            targets.setdefault(str(ini_entry.path), list()).append(ini_entry)
+
+    for path, ini_entries in targets.items():
+        try:
+            target = Ini_target(Path(path))
+        except Exception as exc:
+            logdata = {'path': path, 'exc': exc}
+            log('D176', logdata)
+            continue
+        for ini_entry in ini_entries:
+            target.apply(ini_entry)
         try:
-            if self.action == FileAction.CREATE:
-                self._create_action()
-            if self.action == FileAction.UPDATE:
-                self._create_action()
-            if self.action == FileAction.DELETE:
-                self._delete_action()
-            if self.action == FileAction.REPLACE:
-                self._create_action()
+            target.save()
         except Exception as exc:
             logdata = dict()
-            logdata['action'] = self.action
+            logdata['path'] = path
             logdata['exc'] = exc
             log('W23', logdata)
 
@@ -0,0 +1,167 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2026 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import re
+
+from util.logging import log
+from util.util import read_file_if_exists, write_file_if_changed
+
+# Entry options like [$i] or [$e] which follow the key name. Locale
+# suffixes like [ru] are part of the key.
+_key_options_re = re.compile(r'^(.*?)((?:\[\$[a-z]+\])*)$')
+
+
+def escape_value(value):
+    '''
+    Escape value the same way KConfig (and kwriteconfig5) does.
+    '''
+    value = str(value)
+    value = (value.replace('\\', '\\\\')
+        .replace('\n', '\\n')
+        .replace('\t', '\\t')
+        .replace('\r', '\\r'))
+    if value.startswith(' '):
+        value = '\\s' + value[1:]
+    if value.endswith(' '):
+        value = value[:-1] + '\\s'
+    return value
+
+
+def format_entry(key, value, lock=False):
+    return '{}{}={}'.format(key, '[$i]' if lock else '', escape_value(value))
+
+
+def parse_entry(line):
+    '''
+    Return (key, options) for entry line or None for other lines.
+    '''
+    stripped = line.strip()
+    if not stripped or stripped.startswith('#') or stripped.startswith('['):
+        return None
+    key, sep, _ = stripped.partition('=')
+    if not sep:
+        return None
+    match = _key_options_re.match(key.strip())
+    return (match.group(1), match.group(2))
+
+
+def group_name(header):
+    '''
+    Get group name from header line. Nested groups are kept joined
+    with '][' like '[Containments][1][General]' -> 'Containments][1][General'.
+    '''
+    name = header.strip()[1:-1]
+    if name.endswith('][$i'):
+        name = name[:-4]
+    return name
+
+
+class kconfig_file:
+    '''
+    KConfig-compatible rc-file reader and writer. The file is loaded
+    once, all settings are changed in memory and the result is written
+    at once. Unrelated groups, comments and ordering are preserved.
+    '''
+    def __init__(self, path, load=True):
+        self.path = path
+        self.trailing_newline = True
+        self.mode = 0o644
+        # Lines before the first group header
+        self.preamble = list()
+        # List of [group name, header line, list of lines]
+        self.groups = list()
+        content = read_file_if_exists(path) if load else None
+        if content is not None:
+            self.parse(content)
+            try:
+                self.mode = os.stat(path).st_mode & 0o777
+            except OSError:
+                pass
+
+    def parse(self, content):
+        self.trailing_newline = content.endswith('\n') or not content
+        lines = self.preamble
+        for line in content.splitlines():
+            stripped = line.strip()
+            if stripped.startswith('[') and stripped.endswith(']'):
+                lines = list()
+                self.groups.append([group_name(stripped), line, lines])
+            else:
+                lines.append(line)
+
+    def render(self):
+        lines = list(self.preamble)
+        for _, header, body in self.groups:
+            lines.append(header)
+            lines.extend(body)
+        content = '\n'.join(lines)
+        if content and self.trailing_newline:
+            content += '\n'
+        return content
+
+    def find_group(self, name):
+        for group in self.groups:
+            if group[0] == name:
+                return group
+        return None
+
+    def set_value(self, group, key, value, lock=False):
+        '''
+        Set the value of key in group (nested groups are joined with
+        '][') replacing both locked and unlocked entries of the key.
+        '''
+        new_line = format_entry(key, value, lock)
+        target = self.find_group(group)
+        if target is None:
+            if self.groups or self.preamble:
+                last_lines = self.groups[-1][2] if self.groups else self.preamble
+                if last_lines and last_lines[-1].strip():
+                    last_lines.append('')
+            self.groups.append([group, '[{}]'.format(group), [new_line]])
+            return
+
+        body = target[2]
+        replaced = False
+        for index in range(len(body) - 1, -1, -1):
+            entry = parse_entry(body[index])
+            if not entry or entry[0] != key:
+                continue
+            if '[$i]' in entry[1] and not lock:
+                logdata = dict()
+                logdata['line'] = body[index].strip()
+                log('I10', logdata)
+            if replaced:
+                del body[index]
+            else:
+                body[index] = new_line
+                replaced = True
+        if not replaced:
+            # Insert after the last entry keeping blank lines between groups
+            index = len(body)
+            while index > 0 and not body[index - 1].strip():
+                index -= 1
+            body.insert(index, new_line)
+
+    def write(self):
+        '''
+        Write file atomically in case it was changed. Returns True when
+        the file was written.
+        '''
+        return write_file_if_changed(self.path, self.render(), self.mode)
@@ -26,11 +26,39 @@ from util.logging import log
 from util.windows import expand_windows_var
 
 
+def get_usershares():
+    '''
+    Read all the current user's shares with single 'net usershare info'
+    call.
+
+    :return: Dictionary of share name in lower case to share properties
+    or None in case the state is unknown
+    '''
+    try:
+        res = subprocess.check_output(['/usr/bin/net', 'usershare', 'info'],
+            stderr=subprocess.DEVNULL, encoding='utf-8')
+    except Exception as exc:
+        logdata = dict()
+        logdata['exc'] = exc
+        log('D235', logdata)
+        return None
+
+    usershares = dict()
+    share = None
+    for line in res.splitlines():
+        line = line.strip()
+        if line.startswith('[') and line.endswith(']'):
+            share = dict()
+            usershares[line[1:-1].lower()] = share
+        elif share is not None and '=' in line:
+            key, _, value = line.partition('=')
+            share[key.strip()] = value.strip()
+    return usershares
+
 class Networkshare:
 
     def __init__(self, networkshare_obj, username = None):
         self.net_full_cmd = ['/usr/bin/net', 'usershare']
-        self.net_cmd_check = ['/usr/bin/net', 'usershare', 'list']
         self.cmd = list()
         self.name = networkshare_obj.name
         self.path = expand_windows_var(networkshare_obj.path, username).replace('\\', '/') if networkshare_obj.path else None
@@ -42,14 +70,16 @@ class Networkshare:
         self.abe = networkshare_obj.abe
         self._guest = 'guest_ok=y'
         self.acl = 'Everyone:'
-        self.act()
 
-    def check_list_net(self):
-        try:
-            res = subprocess.check_output(self.net_cmd_check, encoding='utf-8')
-            return res
-        except Exception as exc:
-            return exc
+    def is_actual(self, usershare):
+        '''
+        Check that existing share matches the policy.
+        '''
+        acl = usershare.get('usershare_acl', '').strip(',').rpartition('\\')[2]
+        return (usershare.get('path') == self.path
+            and usershare.get('comment', '') == (self.comment or '')
+            and acl.lower() == (self.acl + 'F').lower()
+            and 'guest_ok=' + usershare.get('guest_ok', '') == self._guest)
 
     def _run_net_full_cmd(self):
         logdata = dict()
@@ -79,12 +109,43 @@ class Networkshare:
         self.net_full_cmd.append(self.name)
         self._run_net_full_cmd()
 
-    def act(self):
-        if self.action == FileAction.CREATE:
-            self._create_action()
-        if self.action == FileAction.UPDATE:
-            self._create_action()
+    def act(self, usershares=None):
+        '''
+        Bring the share to the state required by policy.
+
+        :usershares: Current shares as returned by get_usershares(), None
+        means the state is unknown and the command is always run
+        '''
+        usershare = None
+        if usershares is not None:
+            usershare = usershares.get(self.name.lower())
+
         if self.action == FileAction.DELETE:
-            self._delete_action()
-        if self.action == FileAction.REPLACE:
+            if usershares is None or usershare is not None:
+                self._delete_action()
+                return
+        elif usershare is None or not self.is_actual(usershare):
             self._create_action()
+            return
+
+        logdata = dict()
+        logdata['name'] = self.name
+        log('D234', logdata)
+
+def apply_networkshares(networkshare_objects, username=None):
+    '''
+    Compare shares from policy with the existing ones and run 'net
+    usershare' only for the shares to be added, modified or deleted.
+    The last entry for the share name in policy order wins.
+    '''
+    shares = dict()
+    for networkshare_obj in networkshare_objects:
+        share = Networkshare(networkshare_obj, username)
+        shares.pop(share.name.lower(), None)
+        shares[share.name.lower()] = share
+
+    if not shares:
+        return
+    usershares = get_usershares()
+    for share in shares.values():
+        share.act(usershares)
@@ -20,12 +20,16 @@ import os
 import jinja2
 
 from util.logging import log
+from util.util import write_file_if_changed
 
 class polkit:
     __template_path = '/usr/share/gpupdate/templates'
     __policy_dir    = '/etc/polkit-1/rules.d'
     __template_loader = jinja2.FileSystemLoader(searchpath=__template_path)
-    __template_environment = jinja2.Environment(loader=__template_loader)
+    # Templates are not changed while gpupdate runs so there is no need
+    # to check them for modification on every use.
+    __template_environment = jinja2.Environment(loader=__template_loader, auto_reload=False)
+    __templates = dict()
 
     def __init__(self, template_name, arglist, username=None):
         self.template_name = template_name
@@ -45,22 +49,33 @@ class polkit:
                 return False
         return True
 
+    def _get_template(self):
+        '''
+        Get template compiled once per process.
+        '''
+        template = self.__templates.get(self.infilename)
+        if template is None:
+            template = self.__template_environment.get_template(self.infilename)
+            self.__templates[self.infilename] = template
+        return template
+
     def generate(self):
         if self._is_empty():
             if os.path.isfile(self.outfile):
                 os.remove(self.outfile)
             return
         try:
-            template = self.__template_environment.get_template(self.infilename)
-            text = template.render(**self.args)
-
-            with open(self.outfile, 'w') as f:
-                f.write(text)
+            text = self._get_template().render(**self.args)
 
+            # Rewriting the rules makes polkitd reload them so the file
+            # is replaced only in case the content changed.
             logdata = dict()
             logdata['file'] = self.outfile
             logdata['arguments'] = self.args
-            log('D77', logdata)
+            if write_file_if_changed(self.outfile, text):
+                log('D77', logdata)
+            else:
+                log('D231', logdata)
         except Exception as exc:
             logdata = dict()
             logdata['file'] = self.outfile
@@ -0,0 +1,185 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2026 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from util.logging import log
+from util.util import (
+      copy_file_if_changed
+    , read_file_if_exists
+    , write_file_if_changed
+)
+from .folder import remove_dir_tree
+
+
+manifest_name = '.manifest.json'
+settings_name = '.settings.json'
+settings_branch = '/Software/BaseALT/Policies/GPUpdate'
+settings_keys = {
+      'ScriptsParallel': 'parallel'
+    , 'ScriptsTimeout': 'timeout'
+    , 'ScriptsTotalTimeout': 'total-timeout'
+}
+
+def get_runner_settings(storage):
+    '''
+    Read scripts_runner pool size and time budgets from the policy
+    '''
+    settings = dict()
+    for key, name in settings_keys.items():
+        value = storage.get_key_value('{}/{}'.format(settings_branch, key))
+        try:
+            settings[name] = int(value)
+        except (TypeError, ValueError):
+            pass
+    return settings
+
+def script_name(storage_script_entry):
+    '''
+    Name of the script in the cache prefixed with its order number
+    '''
+    return (str(int(storage_script_entry.number)).zfill(5)
+        + '_' + os.path.basename(storage_script_entry.path))
+
+def script_record(storage_script_entry, mode):
+    '''
+    Manifest record describing the state of the script source
+    '''
+    src_stat = os.stat(storage_script_entry.path)
+    args = storage_script_entry.args if storage_script_entry.args else ''
+    record = dict()
+    record['number'] = int(storage_script_entry.number)
+    record['source'] = storage_script_entry.path
+    record['size'] = src_stat.st_size
+    record['mtime'] = src_stat.st_mtime_ns
+    record['args'] = hashlib.sha256(args.encode()).hexdigest() if args else None
+    record['mode'] = mode
+    return record
+
+def remove_entry(path):
+    if path.is_dir() and not path.is_symlink():
+        remove_dir_tree(path, True, True, True)
+    elif path.exists() or path.is_symlink():
+        path.unlink()
+
+class scripts_cache:
+    '''
+    Synchronize the directory with cached scripts against the manifest of
+    scripts copied during the previous run. Unchanged scripts are left
+    alone, changed ones are replaced atomically and stale ones are removed.
+    '''
+    def __init__(self, cache_dir, mode):
+        self.cache_dir = Path(cache_dir)
+        self.mode = mode
+        self.manifest_file = self.cache_dir / manifest_name
+        self.manifest = self.load_manifest()
+
+    def load_manifest(self):
+        try:
+            manifest = json.loads(read_file_if_exists(self.manifest_file) or '{}')
+        except ValueError:
+            return dict()
+        return manifest if isinstance(manifest, dict) else dict()
+
+    def is_actual(self, rel_path, record):
+        if self.manifest.get(rel_path) != record:
+            return False
+        target = self.cache_dir / rel_path
+        if not target.is_file():
+            return False
+        return (not record['args']) or (target.parent / (target.name + '.arg') / 'arg').is_file()
+
+    def install(self, storage_script_entry, target, record):
+        target.parent.mkdir(parents=True, exist_ok=True)
+        copy_file_if_changed(storage_script_entry.path, str(target), self.mode)
+        arg_dir = target.parent / (target.name + '.arg')
+        if storage_script_entry.args:
+            arg_dir.mkdir(exist_ok=True)
+            write_file_if_changed(str(arg_dir / 'arg'), storage_script_entry.args)
+        else:
+            remove_entry(arg_dir)
+
+    def sync(self, scripts):
+        '''
+        Bring the cache in line with the scripts.
+
+        :scripts: Dictionary mapping action directory name (e.g. 'STARTUP')
+            to the list of script entries from storage
+        '''
+        manifest = dict()
+        for action, entries in scripts.items():
+            action_dir = self.cache_dir / action
+            expected = set()
+            for entry in entries:
+                name = script_name(entry)
+                rel_path = '{}/{}'.format(action, name)
+                logdata = dict()
+                logdata['script'] = rel_path
+                logdata['source'] = entry.path
+                try:
+                    record = script_record(entry, self.mode)
+                    if self.is_actual(rel_path, record):
+                        log('D238', logdata)
+                    else:
+                        log('D239', logdata)
+                        self.install(entry, action_dir / name, record)
+                except Exception as exc:
+                    logdata['exc'] = exc
+                    log('E74', logdata)
+                    continue
+                manifest[rel_path] = record
+                expected.add(name)
+                if entry.args:
+                    expected.add(name + '.arg')
+            self.remove_stale(action_dir, expected)
+
+        if self.manifest != manifest:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            write_file_if_changed(str(self.manifest_file),
+                json.dumps(manifest, indent=1, sort_keys=True), 0o600)
+            self.manifest = manifest
+
+    def write_settings(self, settings):
+        '''
+        Store settings for scripts_runner next to the scripts. The file
+        is readable by users as user scripts are run in their sessions.
+        '''
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        write_file_if_changed(str(self.cache_dir / settings_name),
+            json.dumps(settings, indent=1, sort_keys=True), 0o644)
+
+    def remove_stale(self, action_dir, expected):
+        '''
+        Remove entries of the action directory which are not expected
+        '''
+        if not action_dir.is_dir():
+            return
+        with os.scandir(action_dir) as it:
+            stale = [entry.name for entry in it if entry.name not in expected]
+        for name in stale:
+            logdata = dict()
+            logdata['script'] = '{}/{}'.format(action_dir.name, name)
+            log('D240', logdata)
+            remove_entry(action_dir / name)
+        if not expected:
+            action_dir.rmdir()
+
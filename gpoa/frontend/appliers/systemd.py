@@ -15,65 +15,302 @@
 #
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
-
 import dbus
 import logging
 
 from util.logging import slogm, log
 
+# Unit file states which don't require EnableUnitFiles call
+_enabled_file_states = frozenset([
+      'enabled'
+    , 'enabled-runtime'
+    , 'static'
+    , 'alias'
+    , 'generated'
+    , 'transient'
+])
+_masked_file_states = frozenset(['masked', 'masked-runtime'])
+
+# In case the service has 'RestartSec' property set it
+# switches to 'activating (auto-restart)' state instead of
+# 'active' so we consider 'activating' a valid state too.
+_started_states = frozenset(['active', 'activating', 'reloading'])
+_stopped_states = frozenset(['stopped', 'deactivating', 'inactive', 'failed'])
+
 class systemd_unit:
+    '''
+    Desired state of the single systemd unit.
+    '''
     def __init__(self, unit_name, state):
-        self.system_bus = dbus.SystemBus()
+        self.unit_name = unit_name
+        self.desired_state = state
+
+    def is_started(self, active_state):
+        return active_state in _started_states
+
+    def is_stopped(self, active_state):
+        return active_state in _stopped_states
+
+
+class systemd_manager:
+    '''
+    Bring a set of systemd units to the desired state using single
+    connection to the system bus. Current unit states are fetched in
+    bulk and only the operations which really change something are
+    issued. Start/stop jobs run concurrently and are awaited via
+    JobRemoved signal.
+    '''
+    __job_timeout = 90
+
+    def __init__(self):
+        from dbus.mainloop.glib import DBusGMainLoop
+
+        self.system_bus = dbus.SystemBus(private=True, mainloop=DBusGMainLoop())
         self.systemd_dbus = self.system_bus.get_object('org.freedesktop.systemd1', '/org/freedesktop/systemd1')
         self.manager = dbus.Interface(self.systemd_dbus, 'org.freedesktop.systemd1.Manager')
+        self.jobs = dict()
+        self.finished_jobs = dict()
+        self.loop = None
+        self.timed_out = False
+        self.system_bus.add_signal_receiver(
+              self._job_removed
+            , signal_name='JobRemoved'
+            , dbus_interface='org.freedesktop.systemd1.Manager'
+            , path='/org/freedesktop/systemd1')
+        self.manager.Subscribe()
 
-        self.unit_name = unit_name
-        self.desired_state = state
-        self.unit = self.manager.LoadUnit(dbus.String(self.unit_name))
-        self.unit_proxy = self.system_bus.get_object('org.freedesktop.systemd1', str(self.unit))
-        self.unit_interface = dbus.Interface(self.unit_proxy, dbus_interface='org.freedesktop.systemd1.Unit')
-        self.unit_properties = dbus.Interface(self.unit_proxy, dbus_interface='org.freedesktop.DBus.Properties')
-
-    def apply(self):
-        if self.desired_state == 1:
-            self.manager.UnmaskUnitFiles([self.unit_name], dbus.Boolean(False))
-            self.manager.EnableUnitFiles([self.unit_name], dbus.Boolean(False), dbus.Boolean(True))
-            self.manager.StartUnit(self.unit_name, 'replace')
-            logdata = dict()
-            logdata['unit'] = self.unit_name
-            log('I6', logdata)
-
-            # In case the service has 'RestartSec' property set it
-            # switches to 'activating (auto-restart)' state instead of
-            # 'active' so we consider 'activating' a valid state too.
-            service_state = self._get_state()
-
-            if not service_state in ['active', 'activating']:
-                service_timer_name =  self.unit_name.replace(".service", ".timer")
-                self.unit = self.manager.LoadUnit(dbus.String(service_timer_name))
-                service_state = self._get_state()
-                if not service_state in ['active', 'activating']:
-                    logdata = dict()
-                    logdata['unit'] = self.unit_name
-                    log('E46', logdata)
-        else:
-            self.manager.StopUnit(self.unit_name, 'replace')
-            self.manager.DisableUnitFiles([self.unit_name], dbus.Boolean(False))
-            self.manager.MaskUnitFiles([self.unit_name], dbus.Boolean(False), dbus.Boolean(True))
+    def close(self):
+        try:
+            self.manager.Unsubscribe()
+        except dbus.exceptions.DBusException:
+            pass
+        self.system_bus.close()
+
+    def get_unit_file_states(self, unit_names):
+        '''
+        Get UnitFileState of the units as dictionary. Units which have
+        no unit file are not present in the result.
+        '''
+        file_states = dict()
+        unit_files = self.manager.ListUnitFilesByPatterns(
+              dbus.Array([], signature='s')
+            , dbus.Array(unit_names, signature='s'))
+        for path, state in unit_files:
+            file_states[str(path).rpartition('/')[2]] = str(state)
+        return file_states
+
+    def get_active_states(self, unit_names):
+        '''
+        Get (LoadState, ActiveState) pairs of the units as dictionary.
+        '''
+        active_states = dict()
+        for unit in self.manager.ListUnitsByNames(dbus.Array(unit_names, signature='s')):
+            active_states[str(unit[0])] = (str(unit[2]), str(unit[3]))
+        return active_states
+
+    def load_units(self, units):
+        '''
+        Fetch states of all units at once. Fall back to per-unit query
+        in case the batch is rejected (e.g. because of invalid unit
+        name) in order to skip only the broken entries.
+        '''
+        names = [unit.unit_name for unit in units]
+        try:
+            return units, self.get_active_states(names)
+        except dbus.exceptions.DBusException:
+            pass
+
+        valid_units = list()
+        active_states = dict()
+        for unit in units:
+            try:
+                active_states.update(self.get_active_states([unit.unit_name]))
+                valid_units.append(unit)
+            except Exception as exc:
+                logdata = dict()
+                logdata['unit'] = unit.unit_name
+                logdata['exc'] = exc
+                log('I5', logdata)
+        return valid_units, active_states
+
+    def apply(self, units):
+        units, active_states = self.load_units(units)
+        if not units:
+            return
+        file_states = self.get_unit_file_states([unit.unit_name for unit in units])
+
+        to_stop = list()
+        to_mask = list()
+        to_unmask = list()
+        to_enable = list()
+        to_start = list()
+        changed = list()
+        for unit in units:
+            name = unit.unit_name
+            load_state, active_state = active_states.get(name, ('not-found', 'inactive'))
+            file_state = file_states.get(name)
+            if load_state == 'not-found' and file_state is None:
+                logdata = dict()
+                logdata['unit'] = name
+                log('E45', logdata)
+                continue
+            if unit.desired_state == 1:
+                ops = [
+                      (to_unmask, file_state in _masked_file_states)
+                    , (to_enable, file_state not in _enabled_file_states)
+                    , (to_start, not unit.is_started(active_state))
+                ]
+            else:
+                ops = [
+                      (to_stop, not unit.is_stopped(active_state))
+                    , (to_mask, file_state not in _masked_file_states)
+                ]
+            unit_changed = False
+            for op_list, needed in ops:
+                if needed:
+                    op_list.append(name)
+                    unit_changed = True
             logdata = dict()
-            logdata['unit'] = self.unit_name
-            log('I6', logdata)
+            logdata['unit'] = name
+            if unit_changed:
+                changed.append(unit)
+                log('I6', logdata)
+            else:
+                log('D220', logdata)
+
+        failed = set()
+        failed.update(self.call_units('DisableUnitFiles'
+            , to_mask, dbus.Boolean(False)))
+        to_mask = [name for name in to_mask if name not in failed]
+        failed.update(self.call_units('MaskUnitFiles'
+            , to_mask, dbus.Boolean(False), dbus.Boolean(True)))
+        failed.update(self.call_units('UnmaskUnitFiles'
+            , to_unmask, dbus.Boolean(False)))
+        to_enable = [name for name in to_enable if name not in failed]
+        failed.update(self.call_units('EnableUnitFiles'
+            , to_enable, dbus.Boolean(False), dbus.Boolean(True)))
+        if to_mask or to_unmask or to_enable:
+            self.manager.Reload()
 
-            service_state = self._get_state()
+        for name in to_stop:
+            if not self._queue_job(name, self.manager.StopUnit, 'replace'):
+                failed.add(name)
+        for name in to_start:
+            if name in failed or not self._queue_job(name, self.manager.StartUnit, 'replace'):
+                failed.add(name)
+        self.wait_jobs()
 
-            if not service_state in ['stopped', 'deactivating', 'inactive']:
+        changed = [unit for unit in changed if unit.unit_name not in failed]
+        if changed:
+            self.check_units(changed)
+
+    def call_units(self, method_name, unit_names, *args):
+        '''
+        Call unit file method for all units at once. Fall back to per-unit
+        calls in case the batch is rejected in order to fail only the
+        broken entries.
+
+        :return: List of unit names the method failed for
+        '''
+        if not unit_names:
+            return list()
+        method = getattr(self.manager, method_name)
+        try:
+            method(dbus.Array(unit_names, signature='s'), *args)
+            return list()
+        except dbus.exceptions.DBusException:
+            pass
+
+        failed = list()
+        for name in unit_names:
+            try:
+                method(dbus.Array([name], signature='s'), *args)
+            except dbus.exceptions.DBusException as exc:
                 logdata = dict()
-                logdata['unit'] = self.unit_name
+                logdata['unit'] = name
+                logdata['operation'] = method_name
+                logdata['exc'] = exc
+                log('E45', logdata)
+                failed.append(name)
+        return failed
+
+    def check_units(self, units):
+        names = [unit.unit_name for unit in units]
+        timer_names = [name.replace('.service', '.timer') for name in names
+            if name.endswith('.service')]
+        active_states = self.get_active_states(names + timer_names)
+        for unit in units:
+            name = unit.unit_name
+            active_state = active_states.get(name, ('', ''))[1]
+            if unit.desired_state == 1:
+                timer_state = active_states.get(name.replace('.service', '.timer'), ('', ''))[1]
+                ok = unit.is_started(active_state) or unit.is_started(timer_state)
+            else:
+                ok = unit.is_stopped(active_state)
+            if not ok:
+                logdata = dict()
+                logdata['unit'] = name
                 log('E46', logdata)
 
-    def _get_state(self):
+    def _queue_job(self, unit_name, method, mode):
         '''
-        Get the string describing service state.
+        Submit start/stop job for the single unit so rejected job affects
+        only this unit.
+
+        :return: True in case the job was queued
         '''
-        return self.unit_properties.Get('org.freedesktop.systemd1.Unit', 'ActiveState')
+        try:
+            job = method(unit_name, mode)
+            self.jobs[str(job)] = unit_name
+            return True
+        except Exception as exc:
+            logdata = dict()
+            logdata['unit'] = unit_name
+            logdata['exc'] = exc
+            log('E45', logdata)
+        return False
+
+    def _pending_jobs(self):
+        return [job for job in self.jobs if job not in self.finished_jobs]
+
+    def _job_removed(self, job_id, job_path, unit_name, result):
+        self.finished_jobs[str(job_path)] = str(result)
+        if self.loop and not self._pending_jobs():
+            self.loop.quit()
+
+    def wait_jobs(self):
+        '''
+        Wait for all queued jobs to be removed from systemd queue.
+        '''
+        if not self._pending_jobs():
+            return
+        from gi.repository import GLib
+
+        logdata = dict()
+        logdata['jobs'] = len(self.jobs)
+        log('D221', logdata)
+        self.loop = GLib.MainLoop()
+        # JobRemoved signals received while the jobs were being queued
+        # are dispatched on the first loop iteration so check pending
+        # jobs from there too.
+        GLib.idle_add(self._stop_waiting)
+        timeout = GLib.timeout_add_seconds(self.__job_timeout, self._stop_waiting, True)
+        self.timed_out = False
+        self.loop.run()
+        if not self.timed_out:
+            GLib.source_remove(timeout)
+        self.loop = None
+
+        pending = self._pending_jobs()
+        if pending:
+            logdata = dict()
+            logdata['units'] = [self.jobs[job] for job in pending]
+            log('W26', logdata)
 
+    def _stop_waiting(self, timed_out=False):
+        if not self.loop:
+            return False
+        self.timed_out = timed_out
+        if timed_out or not self._pending_jobs():
+            self.loop.quit()
+        return False
@@ -21,10 +21,12 @@ from .applier_frontend import (
     , check_enabled
 )
 
-import json
-import os
+from .appliers.browser_policy import (
+      build_chromium_policies
+    , write_chromium_policies
+)
 from util.logging import log
-from util.util import is_machine_name, string_to_literal_eval
+from util.util import is_machine_name
 
 class chromium_applier(applier_frontend):
     __module_name = 'ChromiumApplier'
@@ -33,6 +35,68 @@ class chromium_applier(applier_frontend):
     __registry_branch = 'Software/Policies/Google/Chrome'
     __managed_policies_path = '/etc/chromium/policies/managed'
     __recommended_policies_path = '/etc/chromium/policies/recommended'
+    # List of keys resulting from parsing chrome.admx with
+    # parsing_chrom_admx_intvalues.py
+    __valuename_typeint = frozenset([
+          'DefaultClipboardSetting'
+        , 'DefaultCookiesSetting'
+        , 'DefaultFileSystemReadGuardSetting'
+        , 'DefaultFileSystemWriteGuardSetting'
+        , 'DefaultGeolocationSetting'
+        , 'DefaultImagesSetting'
+        , 'DefaultInsecureContentSetting'
+        , 'DefaultJavaScriptJitSetting'
+        , 'DefaultJavaScriptSetting'
+        , 'DefaultLocalFontsSetting'
+        , 'DefaultNotificationsSetting'
+        , 'DefaultPopupsSetting'
+        , 'DefaultSensorsSetting'
+        , 'DefaultSerialGuardSetting'
+        , 'DefaultThirdPartyStoragePartitioningSetting'
+        , 'DefaultWebBluetoothGuardSetting'
+        , 'DefaultWebHidGuardSetting'
+        , 'DefaultWebUsbGuardSetting'
+        , 'DefaultWindowManagementSetting'
+        , 'DefaultMediaStreamSetting'
+        , 'DefaultWindowPlacementSetting'
+        , 'ProxyServerMode'
+        , 'ExtensionManifestV2Availability'
+        , 'ExtensionUnpublishedAvailability'
+        , 'BrowserSwitcherParsingMode'
+        , 'CloudAPAuthEnabled'
+        , 'AdsSettingForIntrusiveAdsSites'
+        , 'AmbientAuthenticationInPrivateModesEnabled'
+        , 'BatterySaverModeAvailability'
+        , 'BrowserSignin'
+        , 'ChromeVariations'
+        , 'DeveloperToolsAvailability'
+        , 'DownloadRestrictions'
+        , 'ForceYouTubeRestrict'
+        , 'HeadlessMode'
+        , 'IncognitoModeAvailability'
+        , 'IntranetRedirectBehavior'
+        , 'NetworkPredictionOptions'
+        , 'ProfilePickerOnStartupAvailability'
+        , 'RelaunchNotification'
+        , 'SafeSitesFilterBehavior'
+        , 'UserAgentReduction'
+        , 'BatterySaverModeAvailability_recommended'
+        , 'DownloadRestrictions_recommended'
+        , 'NetworkPredictionOptions_recommended'
+        , 'PrintPostScriptMode'
+        , 'PrintRasterizationMode'
+        , 'ChromeFrameRendererSettings'
+        , 'DefaultFileHandlingGuardSetting'
+        , 'DefaultKeygenSetting'
+        , 'DefaultPluginsSetting'
+        , 'LegacySameSiteCookieBehaviorEnabled'
+        , 'ForceMajorVersionToMinorPositionInUserAgent'
+        , 'PasswordProtectionWarningTrigger'
+        , 'SafeBrowsingProtectionLevel'
+        , 'SafeBrowsingProtectionLevel_recommended'
+        , 'RestoreOnStartup'
+        , 'RestoreOnStartup_recommended'
+    ])
 
     def __init__(self, storage, sid, username):
         self.storage = storage
@@ -54,34 +118,12 @@ class chromium_applier(applier_frontend):
         '''
         Apply machine settings.
         '''
-
-        destfile = os.path.join(self.__managed_policies_path, 'policies.json')
-
-        try:
-            recommended__json = self.policies_json.pop('Recommended')
-        except:
-            recommended__json = {}
-
-        #Replacing all nested dictionaries with a list
-        dict_item_to_list = (
-            lambda target_dict :
-                {key:[*val.values()] if type(val) == dict else string_to_literal_eval(val) for key,val in target_dict.items()}
-            )
-        os.makedirs(self.__managed_policies_path, exist_ok=True)
-        with open(destfile, 'w') as f:
-            json.dump(dict_item_to_list(self.policies_json), f)
-            logdata = dict()
-            logdata['destfile'] = destfile
-            log('D97', logdata)
-
-        destfilerec = os.path.join(self.__recommended_policies_path, 'policies.json')
-        os.makedirs(self.__recommended_policies_path, exist_ok=True)
-        with open(destfilerec, 'w') as f:
-            json.dump(dict_item_to_list(recommended__json), f)
-            logdata = dict()
-            logdata['destfilerec'] = destfilerec
-            log('D97', logdata)
-
+        write_chromium_policies(
+              self.policies_json
+            , self.__managed_policies_path
+            , self.__recommended_policies_path
+            , 'D97'
+        )
 
     def apply(self):
         '''
@@ -94,121 +136,12 @@ class chromium_applier(applier_frontend):
         else:
             log('D96')
 
-    def get_valuename_typeint(self):
-        '''
-        List of keys resulting from parsing chrome.admx with parsing_chrom_admx_intvalues.py
-        '''
-        valuename_typeint = (['DefaultClipboardSetting',
-                            'DefaultCookiesSetting',
-                            'DefaultFileSystemReadGuardSetting',
-                            'DefaultFileSystemWriteGuardSetting',
-                            'DefaultGeolocationSetting',
-                            'DefaultImagesSetting',
-                            'DefaultInsecureContentSetting',
-                            'DefaultJavaScriptJitSetting',
-                            'DefaultJavaScriptSetting',
-                            'DefaultLocalFontsSetting',
-                            'DefaultNotificationsSetting',
-                            'DefaultPopupsSetting',
-                            'DefaultSensorsSetting',
-                            'DefaultSerialGuardSetting',
-                            'DefaultThirdPartyStoragePartitioningSetting',
-                            'DefaultWebBluetoothGuardSetting',
-                            'DefaultWebHidGuardSetting',
-                            'DefaultWebUsbGuardSetting',
-                            'DefaultWindowManagementSetting',
-                            'DefaultMediaStreamSetting',
-                            'DefaultWindowPlacementSetting',
-                            'ProxyServerMode',
-                            'ExtensionManifestV2Availability',
-                            'ExtensionUnpublishedAvailability',
-                            'BrowserSwitcherParsingMode',
-                            'CloudAPAuthEnabled',
-                            'AdsSettingForIntrusiveAdsSites',
-                            'AmbientAuthenticationInPrivateModesEnabled',
-                            'BatterySaverModeAvailability',
-                            'BrowserSignin',
-                            'ChromeVariations',
-                            'DeveloperToolsAvailability',
-                            'DownloadRestrictions',
-                            'ForceYouTubeRestrict',
-                            'HeadlessMode',
-                            'IncognitoModeAvailability',
-                            'IntranetRedirectBehavior',
-                            'NetworkPredictionOptions',
-                            'ProfilePickerOnStartupAvailability',
-                            'RelaunchNotification',
-                            'SafeSitesFilterBehavior',
-                            'UserAgentReduction',
-                            'BatterySaverModeAvailability_recommended',
-                            'DownloadRestrictions_recommended',
-                            'NetworkPredictionOptions_recommended',
-                            'PrintPostScriptMode',
-                            'PrintRasterizationMode',
-                            'ChromeFrameRendererSettings',
-                            'DefaultFileHandlingGuardSetting',
-                            'DefaultKeygenSetting',
-                            'DefaultPluginsSetting',
-                            'LegacySameSiteCookieBehaviorEnabled',
-                            'ForceMajorVersionToMinorPositionInUserAgent',
-                            'PasswordProtectionWarningTrigger',
-                            'SafeBrowsingProtectionLevel',
-                            'SafeBrowsingProtectionLevel_recommended',
-                            'RestoreOnStartup',
-                            'RestoreOnStartup_recommended'])
-        return valuename_typeint
-
-
-    def get_boolean(self,data):
-        if data in ['0', 'false', None, 'none', 0]:
-            return False
-        if data in ['1', 'true', 1]:
-            return True
-    def get_parts(self, hivekeyname):
-        '''
-        Parse registry path string and leave key parameters
-        '''
-        parts = hivekeyname.replace(self.__registry_branch, '').split('/')
-        return parts
-
-
     def create_dict(self, chromium_keys):
         '''
         Collect dictionaries from registry keys into a general dictionary
         '''
-        counts = dict()
-        #getting the list of keys to read as an integer
-        valuename_typeint = self.get_valuename_typeint()
-        for it_data in chromium_keys:
-            branch = counts
-            try:
-                if type(it_data.data) is bytes:
-                    it_data.data = it_data.data.decode(encoding='utf-16').replace('\x00','')
-                parts = self.get_parts(it_data.hive_key)
-                #creating a nested dictionary from elements
-                for part in parts[:-1]:
-                    branch = branch.setdefault(part, {})
-                #dictionary key value initialization
-                if it_data.type == 4:
-                    if it_data.valuename in valuename_typeint:
-                        branch[parts[-1]] = int(it_data.data)
-                    else:
-                        branch[parts[-1]] = self.get_boolean(it_data.data)
-                else:
-                    if it_data.data[0] == '[' and it_data.data[-1] == ']':
-                        try:
-                            branch[parts[-1]] = json.loads(str(it_data.data))
-                        except:
-                            branch[parts[-1]] = str(it_data.data).replace('\\', '/')
-                    else:
-                        branch[parts[-1]] = str(it_data.data).replace('\\', '/')
-
-            except Exception as exc:
-                logdata = dict()
-                logdata['Exception'] = exc
-                logdata['keyname'] = it_data.keyname
-                log('D178', logdata)
-        try:
-            self.policies_json = counts['']
-        except:
-            self.policies_json = {}
+        self.policies_json = build_chromium_policies(
+              self.__registry_branch
+            , chromium_keys
+            , self.__valuename_typeint
+        )
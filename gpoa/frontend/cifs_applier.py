@@ -26,7 +26,10 @@ from .applier_frontend import (
       applier_frontend
     , check_enabled
 )
-from util.util import get_homedir
+from util.util import (
+      get_homedir
+    , write_file_if_changed
+)
 from util.logging import log
 
 def storage_get_drives(storage, sid):
@@ -39,7 +42,22 @@ def storage_get_drives(storage, sid):
     return drive_list
 
 
+# Lines known to be present in files as (filename, line) -> (mtime, size)
+_present_lines = dict()
+
 def add_line_if_missing(filename, ins_line):
+    '''
+    Append the line to the file in case it is absent. The file is scanned
+    only in case it changed since the line was found last time.
+
+    :return: True in case the line was added
+    '''
+    st = os.stat(filename)
+    signature = (st.st_mtime_ns, st.st_size)
+    if _present_lines.get((filename, ins_line)) == signature:
+        return False
+
+    added = False
     with open(filename, 'r+') as f:
         for line in f:
             if ins_line == line.strip():
@@ -47,6 +65,10 @@ def add_line_if_missing(filename, ins_line):
         else:
             f.write(ins_line + '\n')
             f.flush()
+            added = True
+        st = os.fstat(f.fileno())
+    _present_lines[(filename, ins_line)] = (st.st_mtime_ns, st.st_size)
+    return added
 
 def remove_chars_before_colon(input_string):
     if ":" in input_string:
@@ -139,6 +161,7 @@ class cifs_applier(applier_frontend):
             self.applier_cifs._admin_context_apply()
         else:
             log('D180')
+            self.applier_cifs.remove_maps()
 
 class cifs_applier_user(applier_frontend):
     __module_name = 'CIFSApplierUser'
@@ -158,6 +181,8 @@ class cifs_applier_user(applier_frontend):
     __target_mountpoint_user = '/run/media'
     __mountpoint_dirname = 'drives.system'
     __mountpoint_dirname_user = 'drives'
+    __template_loader = jinja2.FileSystemLoader(searchpath=__template_path)
+    __template_env = jinja2.Environment(loader=__template_loader, auto_reload=False)
 
     def __init__(self, storage, sid, username):
         self.storage = storage
@@ -183,17 +208,15 @@ class cifs_applier_user(applier_frontend):
 
         self.user_config = self.auto_master_d / conf_file
         self.user_config_hide = self.auto_master_d / conf_hide_file
-        if os.path.exists(self.user_config.resolve()):
-            self.user_config.unlink()
-        if os.path.exists(self.user_config_hide.resolve()):
-            self.user_config_hide.unlink()
         self.user_autofs = self.auto_master_d / autofs_file
         self.user_autofs_hide = self.auto_master_d / autofs_hide_file
-        if os.path.exists(self.user_autofs.resolve()):
-            self.user_autofs.unlink()
-        if os.path.exists(self.user_autofs_hide.resolve()):
-            self.user_autofs_hide.unlink()
         self.user_creds = self.auto_master_d / cred_file
+        self.map_files = [
+              self.user_config
+            , self.user_config_hide
+            , self.user_autofs
+            , self.user_autofs_hide
+        ]
 
         if username:
             self.mntTarget = self.__mountpoint_dirname_user
@@ -203,9 +226,8 @@ class cifs_applier_user(applier_frontend):
         self.mount_dir = Path(os.path.join(self.home))
         self.drives = storage_get_drives(self.storage, self.sid)
 
-        self.template_loader = jinja2.FileSystemLoader(searchpath=self.__template_path)
-        self.template_env = jinja2.Environment(loader=self.template_loader)
-
+        # Templates are compiled once per process by the shared environment
+        self.template_env = self.__template_env
         self.template_mountpoints = self.template_env.get_template(self.__template_mountpoints)
         self.template_indentity = self.template_env.get_template(self.__template_identity)
         self.template_auto = self.template_env.get_template(self.__template_auto)
@@ -240,7 +262,7 @@ class cifs_applier_user(applier_frontend):
 
         # Add pointer to /etc/auto.master.gpiupdate.d in /etc/auto.master
         auto_destdir = '+dir:{}'.format(self.__auto_dir)
-        add_line_if_missing(self.__auto_file, auto_destdir)
+        master_changed = add_line_if_missing(self.__auto_file, auto_destdir)
 
         # Collect data for drive settings
         drive_list = Drive_list()
@@ -259,45 +281,58 @@ class cifs_applier_user(applier_frontend):
 
             drive_list.append(drive_settings)
 
+        # Render all the maps in memory, absent drives mean the maps
+        # must be removed
+        maps = dict.fromkeys(self.map_files)
         if drive_list.len() > 0:
             mount_settings = dict()
             mount_settings['drives'] = drive_list()
-            mount_text = self.template_mountpoints.render(**mount_settings)
-
-            mount_text_hide = self.template_mountpoints_hide.render(**mount_settings)
-
-            with open(self.user_config.resolve(), 'w') as f:
-                f.truncate()
-                f.write(mount_text)
-                f.flush()
-
-            with open(self.user_config_hide.resolve(), 'w') as f:
-                f.truncate()
-                f.write(mount_text_hide)
-                f.flush()
+            maps[self.user_config] = self.template_mountpoints.render(**mount_settings)
+            maps[self.user_config_hide] = self.template_mountpoints_hide.render(**mount_settings)
 
             autofs_settings = dict()
             autofs_settings['home_dir'] = self.home
             autofs_settings['mntTarget'] = self.mntTarget
             autofs_settings['mount_file'] = self.user_config.resolve()
-            autofs_text = self.template_auto.render(**autofs_settings)
-
-            with open(self.user_autofs.resolve(), 'w') as f:
-                f.truncate()
-                f.write(autofs_text)
-                f.flush()
+            maps[self.user_autofs] = self.template_auto.render(**autofs_settings)
 
             autofs_settings['mount_file'] = self.user_config_hide.resolve()
-            autofs_text = self.template_auto_hide.render(**autofs_settings)
-            with open(self.user_autofs_hide.resolve(), 'w') as f:
-                f.truncate()
-                f.write(autofs_text)
-                f.flush()
+            maps[self.user_autofs_hide] = self.template_auto_hide.render(**autofs_settings)
+
+        maps_changed = self.update_maps(maps) or master_changed
+
+        if drive_list.len() > 0 and self.username:
+            self.update_drivemaps_home_links()
 
-            if self.username:
-                self.update_drivemaps_home_links()
+        self.reload_autofs(maps_changed)
 
-            subprocess.check_call(['/bin/systemctl', 'restart', 'autofs'])
+    def update_maps(self, maps):
+        '''
+        Write the maps which differ from the ones on disk and remove the
+        ones set to None.
+
+        :return: True in case some map changed
+        '''
+        changed = False
+        for map_file, map_text in maps.items():
+            if map_text is None:
+                if map_file.exists():
+                    map_file.unlink()
+                    changed = True
+            elif write_file_if_changed(str(map_file.resolve()), map_text):
+                changed = True
+        return changed
+
+    def reload_autofs(self, maps_changed):
+        '''
+        Make automount re-read its maps. Reload keeps active mounts while
+        restart would drop mounts of all users on the host.
+        '''
+        if not maps_changed:
+            log('D232')
+            return
+        log('D233')
+        subprocess.check_call(['/bin/systemctl', 'reload-or-restart', 'autofs'])
 
     def update_drivemaps_home_links(self):
         dUser = Path(get_homedir(self.username)+'/net.' + self.__mountpoint_dirname_user)
@@ -354,4 +389,12 @@ class cifs_applier_user(applier_frontend):
             self._admin_context_apply()
         else:
             log('D147')
+            self.remove_maps()
+
+    def remove_maps(self):
+        '''
+        Remove maps left from the previous runs.
+        '''
+        maps = dict.fromkeys(self.map_files)
+        self.reload_autofs(self.update_maps(maps))
 
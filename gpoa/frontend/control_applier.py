@@ -20,7 +20,10 @@ from .applier_frontend import (
       applier_frontend
     , check_enabled
 )
-from .appliers.control import control
+from .appliers.control import (
+      control
+    , control_facilities
+)
 from util.logging import slogm, log
 
 import logging
@@ -42,17 +45,18 @@ class control_applier(applier_frontend):
         )
 
     def run(self):
+        facilities = control_facilities()
         for setting in self.control_settings:
             valuename = setting.hive_key.rpartition('/')[2]
             try:
-                self.controls.append(control(valuename, int(setting.data)))
+                self.controls.append(control(valuename, int(setting.data), facilities))
                 logdata = dict()
                 logdata['control'] = valuename
                 logdata['value'] = setting.data
                 log('I3', logdata)
             except ValueError as exc:
                 try:
-                    ctl = control(valuename, setting.data)
+                    ctl = control(valuename, setting.data, facilities)
                 except Exception as exc:
                     logdata = {'Exception': exc}
                     log('I3', logdata)
@@ -69,8 +73,8 @@ class control_applier(applier_frontend):
                 log('E39', logdata)
         #for e in polfile.pol_file.entries:
         #    print('{}:{}:{}:{}:{}'.format(e.type, e.data, e.valuename, e.keyname))
-        for cont in self.controls:
-            cont.set_control_status()
+        facilities.set_controls(self.controls)
+        facilities.save()
 
     def apply(self):
         '''
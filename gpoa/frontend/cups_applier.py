@@ -16,8 +16,6 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-import logging
-import os
 import json
 
 import cups
@@ -26,9 +24,13 @@ from .applier_frontend import (
       applier_frontend
     , check_enabled
 )
-from gpt.printers import json2printer
 from util.rpm import is_rpm_installed
-from util.logging import slogm, log
+from util.paths import cache_dir
+from util.util import (
+      read_file_if_exists
+    , write_file_if_changed
+)
+from util.logging import log
 
 def storage_get_printers(storage, sid):
     '''
@@ -42,13 +44,13 @@ def storage_get_printers(storage, sid):
 
     return printers
 
-def connect_printer(connection, prn):
+def get_printer_config(prn):
     '''
-    Dump printer cinfiguration to disk as CUPS config
+    Decode policy printer into CUPS queue name, description and device URI
     '''
-    # PPD file location
-    printer_driver = 'generic'
-    pjson = json.loads(prn.printer)
+    # Storage may return either the record with serialized printer or
+    # the printer object itself
+    pjson = json.loads(prn.printer if hasattr(prn, 'printer') else prn.to_json())
     printer_parts = pjson['printer']['path'].partition(' ')
     # Printer queue name in CUPS
     printer_name = printer_parts[2].replace('(', '').replace(')', '')
@@ -57,12 +59,111 @@ def connect_printer(connection, prn):
     printer_uri = printer_parts[0].replace('\\', '/')
     printer_uri = 'smb:' + printer_uri
 
-    connection.addPrinter(
-          name=printer_name
-        , info=printer_info
-        , device=printer_uri
-        #filename=printer_driver
-    )
+    return printer_name, printer_info, printer_uri
+
+def connect_cups():
+    '''
+    Connect to CUPS. RPM database is queried only in case the connection
+    fails to tell if CUPS is not installed at all.
+    '''
+    try:
+        return cups.Connection()
+    except Exception as exc:
+        if not is_rpm_installed('cups'):
+            log('W9')
+        else:
+            logdata = dict()
+            logdata['exc'] = exc
+            log('W20', logdata)
+    return None
+
+def get_state_file(scope):
+    return cache_dir() / 'cups_printers_{}.json'.format(scope)
+
+def read_managed_printers(scope):
+    '''
+    Queues configured from the policy during the previous run
+    '''
+    try:
+        managed = json.loads(read_file_if_exists(get_state_file(scope)) or '{}')
+    except ValueError:
+        return dict()
+    return managed if isinstance(managed, dict) else dict()
+
+def read_other_scopes_printers(scope):
+    '''
+    Names of the queues configured from the policy for the scopes other
+    than the specified one
+    '''
+    names = set()
+    state_file = get_state_file(scope)
+    for other_file in state_file.parent.glob('cups_printers_*.json'):
+        if other_file == state_file:
+            continue
+        try:
+            managed = json.loads(read_file_if_exists(other_file) or '{}')
+        except ValueError:
+            continue
+        if isinstance(managed, dict):
+            names.update(managed)
+    return names
+
+def reconcile_printers(connection, printers, scope):
+    '''
+    Compare CUPS queues with the policy printers and issue only the needed
+    add, modify and delete calls. Only the queues previously configured
+    for the same scope and not managed by any other scope are deleted.
+    '''
+    policy_printers = dict()
+    for prn in printers:
+        name, info, uri = get_printer_config(prn)
+        policy_printers[name] = (info, uri)
+
+    existing = connection.getPrinters()
+    managed = dict()
+    for name, (info, uri) in policy_printers.items():
+        logdata = dict()
+        logdata['name'] = name
+        logdata['uri'] = uri
+        current = existing.get(name)
+        if current is not None and current.get('device-uri') == uri and current.get('printer-info') == info:
+            log('D241', logdata)
+        else:
+            log('D242' if current is None else 'D243', logdata)
+            try:
+                connection.addPrinter(name=name, info=info, device=uri)
+            except Exception as exc:
+                logdata['exc'] = exc
+                log('W27', logdata)
+                continue
+        managed[name] = uri
+
+    previous = read_managed_printers(scope)
+    other_scopes = None
+    for name, uri in previous.items():
+        if name in policy_printers or name not in existing:
+            continue
+        # Keep the queue in case it was reconfigured by administrator
+        if existing[name].get('device-uri') != uri:
+            continue
+        logdata = dict()
+        logdata['name'] = name
+        if other_scopes is None:
+            other_scopes = read_other_scopes_printers(scope)
+        if name in other_scopes:
+            log('D248', logdata)
+            continue
+        log('D244', logdata)
+        try:
+            connection.deletePrinter(name)
+        except Exception as exc:
+            logdata['exc'] = exc
+            log('W27', logdata)
+            managed[name] = uri
+
+    if managed != previous:
+        write_file_if_changed(str(get_state_file(scope)),
+            json.dumps(managed, indent=1, sort_keys=True), 0o600)
 
 class cups_applier(applier_frontend):
     __module_name = 'CUPSApplier'
@@ -78,20 +179,11 @@ class cups_applier(applier_frontend):
         )
 
     def run(self):
-        if not is_rpm_installed('cups'):
-            log('W9')
+        self.cups_connection = connect_cups()
+        if self.cups_connection is None:
             return
-        try:
-            self.cups_connection = cups.Connection()
-        except Exception as exc:
-            logdata = dict()
-            logdata['exc', exc]
-            log('W20', logdata)
         self.printers = storage_get_printers(self.storage, self.storage.get_info('machine_sid'))
-
-        if self.printers:
-            for prn in self.printers:
-                connect_printer(self.cups_connection, prn)
+        reconcile_printers(self.cups_connection, self.printers, 'machine')
 
     def apply(self):
         '''
@@ -126,16 +218,11 @@ class cups_applier_user(applier_frontend):
         pass
 
     def run(self):
-        if not is_rpm_installed('cups'):
-            log('W9')
+        self.cups_connection = connect_cups()
+        if self.cups_connection is None:
             return
-
-        self.cups_connection = cups.Connection()
         self.printers = storage_get_printers(self.storage, self.sid)
-
-        if self.printers:
-            for prn in self.printers:
-                connect_printer(self.cups_connection, prn)
+        reconcile_printers(self.cups_connection, self.printers, self.username)
 
     def admin_context_apply(self):
         '''
@@ -17,7 +17,7 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 
-from .appliers.file_cp import Files_cp, Execution_check
+from .appliers.file_cp import Files_planner, Execution_check
 from .applier_frontend import (
       applier_frontend
     , check_enabled
@@ -40,8 +40,7 @@ class file_applier(applier_frontend):
         self.__module_enabled = check_enabled(self.storage, self.__module_name, self.__module_experimental)
 
     def run(self):
-        for file in self.files:
-            Files_cp(file, self.file_cache, self.exe_check)
+        Files_planner(self.files, self.file_cache, self.exe_check).run()
 
     def apply(self):
         if self.__module_enabled:
@@ -69,8 +68,7 @@ class file_applier_user(applier_frontend):
         )
 
     def run(self):
-        for file in self.files:
-            Files_cp(file, self.file_cache, self.exe_check, self.username)
+        Files_planner(self.files, self.file_cache, self.exe_check, self.username).run()
 
     def admin_context_apply(self):
         if self.__module_enabled:
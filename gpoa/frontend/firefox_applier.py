@@ -25,13 +25,18 @@
 # This thing must work with keys and subkeys located at:
 # Software\Policies\Mozilla\Firefox
 
-import json
 import os
 
 from .applier_frontend import (
       applier_frontend
     , check_enabled
 )
+from .appliers.browser_policy import (
+      decode_policy_data
+    , get_boolean
+    , policy_tree
+    , write_policies_json
+)
 from util.logging import log
 from util.util import is_machine_name, try_dict_to_literal_eval
 
@@ -59,30 +64,15 @@ class firefox_applier(applier_frontend):
             , self.__module_experimental
         )
 
-    def get_boolean(self,data):
-        if data in ['0', 'false', None, 'none', 0]:
-            return False
-        if data in ['1', 'true', 1]:
-            return True
-
-    def get_parts(self, hivekeyname):
-        '''
-        Parse registry path string and leave key parameters
-        '''
-        parts = hivekeyname.replace(self.__registry_branch, '').split('/')
-        return parts
-
     def create_dict(self, firefox_keys):
         '''
         Collect dictionaries from registry keys into a general dictionary
         '''
         excp = ['SOCKSVersion']
-        counts = dict()
+        tree = policy_tree(self.__registry_branch)
         for it_data in firefox_keys:
-            branch = counts
             try:
-                if type(it_data.data) is bytes:
-                    it_data.data = it_data.data.decode(encoding='utf-16').replace('\x00','')
+                it_data.data = decode_policy_data(it_data.data)
                 json_data = try_dict_to_literal_eval(it_data.data)
                 if json_data:
                     it_data.data = json_data
@@ -92,63 +82,44 @@ class firefox_applier(applier_frontend):
                         it_data.data = clean_data_firefox(it_data.data)
                 #Cases when it is necessary to create nested dictionaries
                 if it_data.valuename != it_data.data:
-                    parts = self.get_parts(it_data.hive_key)
-                    #creating a nested dictionary from elements
-                    for part in parts[:-1]:
-                        branch = branch.setdefault(part, {})
                     #dictionary key value initialization
                     if it_data.type == 4:
                         if it_data.valuename in excp:
-                            branch[parts[-1]] = int(it_data.data)
+                            value = int(it_data.data)
                         else:
-                            branch[parts[-1]] = self.get_boolean(it_data.data)
+                            value = get_boolean(it_data.data)
                     elif it_data.type == 7:
-                        branch[parts[-1]] = it_data.data
+                        value = it_data.data
                     else:
-                        branch[parts[-1]] = str(it_data.data).replace('\\', '/')
+                        value = str(it_data.data).replace('\\', '/')
+                    tree.set(it_data.hive_key, value)
                 #Cases when it is necessary to create lists in a dictionary
                 else:
-                    parts = self.get_parts(it_data.keyname)
-                    for part in parts[:-1]:
-                        branch = branch.setdefault(part, {})
-                    if branch.get(parts[-1]) is None:
-                        branch[parts[-1]] = list()
                     if it_data.type == 4:
-                        branch[parts[-1]].append(self.get_boolean(it_data.data))
+                        value = get_boolean(it_data.data)
                     else:
-                        if os.path.isdir(str(it_data.data).replace('\\', '/')):
-                            branch[parts[-1]].append(str(it_data.data).replace('\\', '/'))
-                        else:
-                            branch[parts[-1]].append(str(it_data.data))
+                        value = str(it_data.data)
+                        # Windows paths are converted only for existing
+                        # directories, no need to check the rest
+                        if '\\' in value and os.path.isdir(value.replace('\\', '/')):
+                            value = value.replace('\\', '/')
+                    tree.append(it_data.keyname, value)
             except Exception as exc:
                 logdata = dict()
                 logdata['Exception'] = exc
                 logdata['keyname'] = it_data.keyname
                 log('W14', logdata)
 
-        self.policies_json = {'policies': dict_item_to_list(counts)}
+        self.policies_json = {'policies': dict_item_to_list(tree.root)}
 
     def machine_apply(self):
         '''
         Write policies.json to Firefox installdir.
         '''
         self.create_dict(self.firefox_keys)
-        destfile = os.path.join(self.__firefox_installdir1, 'policies.json')
-
-        os.makedirs(self.__firefox_installdir1, exist_ok=True)
-        with open(destfile, 'w') as f:
-            json.dump(self.policies_json, f)
-            logdata = dict()
-            logdata['destfile'] = destfile
-            log('D91', logdata)
-
-        destfile = os.path.join(self.__firefox_installdir2, 'policies.json')
-        os.makedirs(self.__firefox_installdir2, exist_ok=True)
-        with open(destfile, 'w') as f:
-            json.dump(self.policies_json, f)
-            logdata = dict()
-            logdata['destfile'] = destfile
-            log('D91', logdata)
+        for installdir in [self.__firefox_installdir1, self.__firefox_installdir2]:
+            destfile = os.path.join(installdir, 'policies.json')
+            write_policies_json(destfile, self.policies_json, 'D91')
 
     def apply(self):
         if self.__module_enabled:
@@ -97,14 +97,11 @@ class gsettings_applier(applier_frontend):
         return uri_fetch(schema, path, value, self.file_cache)
 
     def run(self):
+        schemas_changed = False
         # Compatility cleanup of old settings
         if os.path.exists(self.override_old_file):
             os.remove(self.override_old_file)
-
-        # Cleanup settings from previous run
-        if os.path.exists(self.override_file):
-            log('D82')
-            os.remove(self.override_file)
+            schemas_changed = True
 
         # Get all configured gsettings locks
         for lock in self.gsettings_locks:
@@ -129,18 +126,25 @@ class gsettings_applier(applier_frontend):
 
         # Create GSettings policy with highest available priority
         self.gsettings.apply()
+        schemas_changed = schemas_changed or self.gsettings.override_changed
 
         # Recompile GSettings schemas with overrides
-        try:
-            proc = subprocess.run(args=['/usr/bin/glib-compile-schemas', self.__global_schema], capture_output=True, check=True)
-        except Exception as exc:
-            log('E48')
+        if schemas_changed:
+            try:
+                proc = subprocess.run(args=['/usr/bin/glib-compile-schemas', self.__global_schema], capture_output=True, check=True)
+            except Exception as exc:
+                log('E48')
+                # Drop the override in order to retry compilation on next run
+                if os.path.exists(self.override_file):
+                    os.remove(self.override_file)
+        else:
+            log('D211')
 
-        # Update desktop configuration system backend
-        try:
-            proc = subprocess.run(args=['/usr/bin/dconf', "update"], capture_output=True, check=True)
-        except Exception as exc:
-            log('E49')
+        # Update desktop configuration system backend at the end of the run
+        if self.gsettings.dconf_changed:
+            self.storage.mark_dconf_dirty('policy')
+        else:
+            log('D212')
 
     def apply(self):
         if self.__module_enabled:
@@ -18,7 +18,7 @@
 
 from pathlib import Path
 
-from .appliers.ini_file import Ini_file
+from .appliers.ini_file import apply_ini_files
 from .applier_frontend import (
       applier_frontend
     , check_enabled
@@ -37,8 +37,7 @@ class ini_applier(applier_frontend):
         self.__module_enabled = check_enabled(self.storage, self.__module_name, self.__module_experimental)
 
     def run(self):
-        for inifile in self.inifiles_info:
-            Ini_file(inifile)
+        apply_ini_files(self.inifiles_info)
 
     def apply(self):
         if self.__module_enabled:
@@ -64,8 +63,7 @@ class ini_applier_user(applier_frontend):
         )
 
     def run(self):
-        for inifile in self.inifiles_info:
-            Ini_file(inifile, self.username)
+        apply_ini_files(self.inifiles_info, self.username)
 
     def admin_context_apply(self):
         pass
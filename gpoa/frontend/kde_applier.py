@@ -17,11 +17,11 @@
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
 from .applier_frontend import applier_frontend, check_enabled
+from .appliers.kconfig import kconfig_file
 from util.logging import log
 from util.util import get_homedir
 from util.exceptions import NotUNCPathError
 import os
-import subprocess
 import re
 import dbus
 
@@ -138,86 +138,33 @@ def apply(all_kde_settings, locks_dict, username = None):
         ]
         for file in system_files:
             file_to_remove = f'{system_path_settings}{file}'
-            if os.path.exists(file_to_remove):
+            if file not in all_kde_settings and os.path.exists(file_to_remove):
                 os.remove(file_to_remove)
         for file_name, sections in all_kde_settings.items():
-            file_path = f'{system_path_settings}{file_name}'
-            with open(file_path, 'w') as file:
-                for section, keys in sections.items():
-                    section = section.replace(')(', '][')
-                    file.write(f'[{section}]\n')
-                    for key, value in keys.items():
-                        lock = f"{file_name}.{section}.{key}".replace('][', ')(')
-                        if lock in locks_dict and locks_dict[lock] == 1:
-                            file.write(f'{key}[$i]={value}\n')
-                        else:
-                            file.write(f'{key}={value}\n')
-                    file.write('\n')
+            config = kconfig_file(f'{system_path_settings}{file_name}', load=False)
+            fill_kconfig(config, file_name, sections, locks_dict)
+            config.write()
     else:
         for file_name, sections in all_kde_settings.items():
-            path = f'{get_homedir(username)}/.config/{file_name}'
-            if not os.path.exists(path):
-                open(path, 'a').close()
-            else:
-                pass
-            for section, keys in sections.items():
-                for key, value in keys.items():
-                    lock = f"{file_name}.{section}.{key}"
-                    if lock in locks_dict and locks_dict[lock] == 1:
-                        command = [
-                            'kwriteconfig5',
-                            '--file', file_name,
-                            '--group', section,
-                            '--key', key +'/$i/',
-                            '--type', 'string',
-                            value
-                        ]
-                    else:
-                        command = [
-                            'kwriteconfig5',
-                            '--file', file_name,
-                            '--group', section,
-                            '--key', key,
-                            '--type', 'string',
-                            value
-                        ]
-                    try:
-                        clear_locks_settings(username, file_name, key)
-                        subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-                    except:
-                            logdata['command'] = command
-                            log('W22', logdata)
-            new_content = []
-            file_path = f'{get_homedir(username)}/.config/{file_name}'
+            config = kconfig_file(f'{get_homedir(username)}/.config/{file_name}')
+            fill_kconfig(config, file_name, sections, locks_dict)
             try:
-                with open(file_path, 'r') as file:
-                    for line in file:
-                        line = line.replace('/$i/', '[$i]').replace(')(', '][')
-                        new_content.append(line)
-                with open(file_path, 'w') as file:
-                    file.writelines(new_content)
-                logdata['file'] = file_name
-                log('D202', logdata)
+                if config.write():
+                    logdata['file'] = file_name
+                    log('D202', logdata)
             except Exception as exc:
                 logdata['exc'] = exc
                 log('W19', logdata)
 
-def clear_locks_settings(username, file_name, key):
+def fill_kconfig(config, file_name, sections, locks_dict):
     '''
-    Method to remove old locked settings
+    Put all settings of the rc-file into its in-memory representation
     '''
-    file_path = f'{get_homedir(username)}/.config/{file_name}'
-    with open(file_path, 'r') as file:
-        lines = file.readlines()
-    with open(file_path, 'w') as file:
-        for line in lines:
-            if f'{key}[$i]=' not in line:
-                file.write(line)
-    for line in lines:
-        if f'{key}[$i]=' in line:
-            logdata = dict()
-            logdata['line'] = line.strip()
-            log('I10', logdata)
+    for section, keys in sections.items():
+        for key, value in keys.items():
+            lock = f"{file_name}.{section}.{key}"
+            locked = lock in locks_dict and locks_dict[lock] == 1
+            config.set_value(section.replace(')(', ']['), key, value, locked)
 
 def apply_for_wallpaper(data, file_cache, username):
     '''
@@ -241,23 +188,18 @@ def apply_for_wallpaper(data, file_cache, username):
             #environment variable for accessing binary files without hard links
         if os.path.isfile(path_to_wallpaper):
             id_desktop = get_id_desktop(path_to_wallpaper)
-            command = [
-                'kwriteconfig5',
-                '--file', 'plasma-org.kde.plasma.desktop-appletsrc',
-                '--group', 'Containments',
-                '--group', id_desktop,
-                '--group', 'Wallpaper',
-                '--group', 'org.kde.image',
-                '--group', 'General',
-                '--key', 'Image',
-                 '--type', 'string',
-                data
-                ]
             try:
-                subprocess.run(command, check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-            except:
-                    logdata['command'] = command
-                    log('E68', logdata)
+                if id_desktop:
+                    config = kconfig_file(path_to_wallpaper)
+                    group = f'Containments][{id_desktop}][Wallpaper][org.kde.image][General'
+                    config.set_value(group, 'Image', data)
+                    config.write()
+                else:
+                    logdata['file'] = path_to_wallpaper
+                    log('W19', logdata)
+            except Exception as exc:
+                logdata['exc'] = exc
+                log('W19', logdata)
             try:
                 session_bus = dbus.SessionBus()
                 plasma_shell = session_bus.get_object('org.kde.plasmashell', '/PlasmaShell', introspect='org.kde.PlasmaShell')
@@ -16,7 +16,7 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from .appliers.netshare import Networkshare
+from .appliers.netshare import apply_networkshares
 from .applier_frontend import (
       applier_frontend
     , check_enabled
@@ -38,8 +38,7 @@ class networkshare_applier(applier_frontend):
         self.__module_enabled_user = check_enabled(self.storage, self.__module_name_user, self.__module_experimental)
 
     def run(self):
-        for networkshare in self.networkshare_info:
-            Networkshare(networkshare, self.username)
+        apply_networkshares(self.networkshare_info, self.username)
 
     def apply(self):
         if self.__module_enabled:
@@ -24,6 +24,14 @@ from .applier_frontend import (
 from .appliers.polkit import polkit
 from util.logging import log
 
+def copy_polkit_map(polkit_map):
+    '''
+    Class-level maps hold the defaults only, every applier instance fills
+    its own copy so repeated runs don't see each other's values.
+    '''
+    return {key: [template, dict(template_vars)]
+        for key, (template, template_vars) in polkit_map.items()}
+
 class polkit_applier(applier_frontend):
     __module_name = 'PolkitApplier'
     __module_experimental = False
@@ -47,12 +55,13 @@ class polkit_applier(applier_frontend):
         polkit_locks_filter = '{}%'.format(self.__registry_locks_branch)
         self.polkit_keys = self.storage.filter_hklm_entries(polkit_filter)
         self.polkit_locks = self.storage.filter_hklm_entries(polkit_locks_filter)
-        template_file = self.__polkit_map[self.__deny_all_win][0]
-        template_vars = self.__polkit_map[self.__deny_all_win][1]
-        template_file_all = self.__polkit_map[self.__registry_branch][0]
-        template_vars_all = self.__polkit_map[self.__registry_branch][1]
-        template_file_all_lock = self.__polkit_map[self.__registry_locks_branch][0]
-        template_vars_all_lock = self.__polkit_map[self.__registry_locks_branch][1]
+        self.polkit_map = copy_polkit_map(self.__polkit_map)
+        template_file = self.polkit_map[self.__deny_all_win][0]
+        template_vars = self.polkit_map[self.__deny_all_win][1]
+        template_file_all = self.polkit_map[self.__registry_branch][0]
+        template_vars_all = self.polkit_map[self.__registry_branch][1]
+        template_file_all_lock = self.polkit_map[self.__registry_locks_branch][0]
+        template_vars_all_lock = self.polkit_map[self.__registry_locks_branch][1]
         locks = list()
         for lock in self.polkit_locks:
             if bool(int(lock.data)):
@@ -73,14 +82,14 @@ class polkit_applier(applier_frontend):
             check_and_add_to_list(it_data, it_data.data)
 
         for key, item in dict_lists_rules.items():
-            self.__polkit_map[self.__registry_branch][1][key] = item[0]
-            self.__polkit_map[self.__registry_locks_branch][1][key] = item[1]
+            template_vars_all[key] = item[0]
+            template_vars_all_lock[key] = item[1]
 
         if deny_all_win:
             logdata = dict()
             logdata['Deny_All_win'] = deny_all_win.data
             log('D69', logdata)
-            self.__polkit_map[self.__deny_all_win][1]['Deny_All'] = deny_all_win.data
+            template_vars['Deny_All'] = deny_all_win.data
         else:
             log('D71')
         self.policies = []
@@ -125,10 +134,11 @@ class polkit_applier_user(applier_frontend):
         polkit_filter = '{}%'.format(self.__registry_branch)
         self.polkit_keys = self.storage.filter_hkcu_entries(self.sid, polkit_filter)
         # Deny_All hook: initialize defaults
-        template_file = self.__polkit_map[self.__deny_all_win][0]
-        template_vars = self.__polkit_map[self.__deny_all_win][1]
-        template_file_all = self.__polkit_map[self.__registry_branch][0]
-        template_vars_all = self.__polkit_map[self.__registry_branch][1]
+        self.polkit_map = copy_polkit_map(self.__polkit_map)
+        template_file = self.polkit_map[self.__deny_all_win][0]
+        template_vars = self.polkit_map[self.__deny_all_win][1]
+        template_file_all = self.polkit_map[self.__registry_branch][0]
+        template_vars_all = self.polkit_map[self.__registry_branch][1]
 
         dict_lists_rules = {'No': [],
                             'Yes': [],
@@ -140,18 +150,18 @@ class polkit_applier_user(applier_frontend):
         for it_data in self.polkit_keys:
             dict_lists_rules[it_data.data].append(it_data.valuename)
 
-        self.__polkit_map[self.__registry_branch][1]['User'] = self.username
+        template_vars_all['User'] = self.username
 
         for key, item in dict_lists_rules.items():
-            self.__polkit_map[self.__registry_branch][1][key] = item
+            template_vars_all[key] = item
 
         if deny_all_win:
             logdata = dict()
             logdata['user'] = self.username
             logdata['Deny_All_win'] = deny_all_win.data
             log('D70', logdata)
-            self.__polkit_map[self.__deny_all_win][1]['Deny_All'] = deny_all_win.data
-            self.__polkit_map[self.__deny_all_win][1]['User'] = self.username
+            template_vars['Deny_All'] = deny_all_win.data
+            template_vars['User'] = self.username
         else:
             log('D72')
         self.policies = []
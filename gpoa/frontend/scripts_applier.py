@@ -16,12 +16,14 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-import os
-import shutil
 from pathlib import Path
 
 from util.logging import log
 from .appliers.folder import remove_dir_tree
+from .appliers.scripts_cache import (
+      scripts_cache
+    , get_runner_settings
+)
 from .applier_frontend import (
       applier_frontend
     , check_enabled
@@ -57,26 +59,25 @@ class scripts_applier(applier_frontend):
 
     def filling_cache(self):
         '''
-        Creating and updating folder directories for scripts and copying them
+        Synchronize folder directories for scripts with the policy
         '''
-        self.folder_path.mkdir(parents=True, exist_ok=True)
-        for ts in self.startup_scripts:
-            script_path = os.path.join(self.__cache_scripts, 'STARTUP')
-            install_script(ts, script_path, '700')
-        for ts in self.shutdown_scripts:
-            script_path = os.path.join(self.__cache_scripts, 'SHUTDOWN')
-            install_script(ts, script_path, '700')
+        scripts = dict()
+        scripts['STARTUP'] = self.startup_scripts
+        scripts['SHUTDOWN'] = self.shutdown_scripts
+        cache = scripts_cache(self.folder_path, 0o700)
+        cache.sync(scripts)
+        cache.write_settings(get_runner_settings(self.storage))
 
     def run(self):
         self.filling_cache()
 
     def apply(self):
-        self.cleaning_cache()
         if self.__module_enabled:
             log('D156')
             self.run()
         else:
             log('D157')
+            self.cleaning_cache()
 
 class scripts_applier_user(applier_frontend):
     __module_name = 'ScriptsApplierUser'
@@ -95,7 +96,6 @@ class scripts_applier_user(applier_frontend):
             , self.__module_name
             , self.__module_experimental
         )
-        self.filling_cache()
 
     def cleaning_cache(self):
         log('D161')
@@ -110,16 +110,14 @@ class scripts_applier_user(applier_frontend):
 
     def filling_cache(self):
         '''
-        Creating and updating folder directories for scripts and copying them
+        Synchronize folder directories for scripts with the policy
         '''
-        self.folder_path.mkdir(parents=True, exist_ok=True)
-
-        for ts in self.logon_scripts:
-            script_path = os.path.join(self.__cache_scripts, self.username, 'LOGON')
-            install_script(ts, script_path, '755')
-        for ts in self.logoff_scripts:
-            script_path = os.path.join(self.__cache_scripts, self.username, 'LOGOFF')
-            install_script(ts, script_path, '755')
+        scripts = dict()
+        scripts['LOGON'] = self.logon_scripts
+        scripts['LOGOFF'] = self.logoff_scripts
+        cache = scripts_cache(self.folder_path, 0o755)
+        cache.sync(scripts)
+        cache.write_settings(get_runner_settings(self.storage))
 
     def user_context_apply(self):
         pass
@@ -128,30 +126,9 @@ class scripts_applier_user(applier_frontend):
         self.filling_cache()
 
     def admin_context_apply(self):
-        self.cleaning_cache()
         if self.__module_enabled:
             log('D158')
             self.run()
         else:
             log('D159')
-
-def install_script(storage_script_entry, script_dir, access_permissions):
-    '''
-    Copy scripts to specific directories and
-    if given arguments
-    create directories for them and copy them there
-    '''
-    dir_cr = Path(script_dir)
-    dir_cr.mkdir(parents=True, exist_ok=True)
-    script_name = str(int(storage_script_entry.number)).zfill(5) + '_' + os.path.basename(storage_script_entry.path)
-    script_file = os.path.join(script_dir, script_name)
-    shutil.copyfile(storage_script_entry.path, script_file)
-
-    os.chmod(script_file, int(access_permissions, base = 8))
-    if storage_script_entry.args:
-        dir_path = script_dir + '/' + script_name + '.arg'
-        dir_arg = Path(dir_path)
-        dir_arg.mkdir(parents=True, exist_ok=True)
-        file_arg = open(dir_path + '/arg', 'w')
-        file_arg.write(storage_script_entry.args)
-        file_arg.close()
+            self.cleaning_cache()
@@ -50,6 +50,8 @@ def apply_shortcut(shortcut, username=None):
     Apply the single shortcut file to the disk.
 
     :username: None means working with machine variables and paths
+
+    :return: Path to the file in case it was changed and None otherwise
     '''
     dest_abspath = shortcut.dest
     if not dest_abspath.startswith('/') and not dest_abspath.startswith('%'):
@@ -94,12 +96,19 @@ def apply_shortcut(shortcut, username=None):
     logdata['file'] = dest_abspath
     logdata['with_action'] = shortcut.action
     log('D106', logdata)
-    shortcut.apply_desktop(dest_abspath)
+    if shortcut.apply_desktop(dest_abspath):
+        return dest_abspath
+    return None
 
 class shortcut_applier(applier_frontend):
     __module_name = 'ShortcutsApplier'
     __module_experimental = False
     __module_enabled = True
+    # Directories indexed by update-desktop-database
+    __desktop_database_dirs = [
+          '/usr/share/applications/'
+        , '/usr/local/share/applications/'
+    ]
 
     def __init__(self, storage):
         self.storage = storage
@@ -112,19 +121,31 @@ class shortcut_applier(applier_frontend):
     def run(self):
         shortcuts = storage_get_shortcuts(self.storage, self.storage.get_info('machine_sid'))
         if shortcuts:
+            changed_files = list()
             for sc in shortcuts:
-                apply_shortcut(sc)
-            if len(shortcuts) > 0:
+                changed_file = apply_shortcut(sc)
+                if changed_file:
+                    changed_files.append(changed_file)
+            if self._desktop_database_changed(changed_files):
                 # According to ArchWiki - this thing is needed to rebuild MIME
                 # type cache in order file bindings to work. This rebuilds
                 # databases located in /usr/share/applications and
                 # /usr/local/share/applications
                 subprocess.check_call(['/usr/bin/update-desktop-database'])
+            else:
+                log('D222')
         else:
             logdata = dict()
             logdata['machine_sid'] = self.storage.get_info('machine_sid')
             log('D100', logdata)
 
+    def _desktop_database_changed(self, changed_files):
+        for changed_file in changed_files:
+            for desktop_dir in self.__desktop_database_dirs:
+                if changed_file.startswith(desktop_dir):
+                    return True
+        return False
+
     def apply(self):
         if self.__module_enabled:
             log('D98')
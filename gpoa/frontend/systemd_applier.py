@@ -20,7 +20,10 @@ from .applier_frontend import (
       applier_frontend
     , check_enabled
 )
-from .appliers.systemd import systemd_unit
+from .appliers.systemd import (
+      systemd_unit
+    , systemd_manager
+)
 from util.logging import slogm, log
 
 import logging
@@ -54,13 +57,24 @@ class systemd_applier(applier_frontend):
                 logdata['unit'] = format(valuename)
                 logdata['exc'] = exc
                 log('I5', logdata)
-        for unit in self.units:
-            try:
-                unit.apply()
-            except:
-                logdata = dict()
-                logdata['unit'] = unit.unit_name
-                log('E45', logdata)
+        if not self.units:
+            return
+        try:
+            manager = systemd_manager()
+        except Exception as exc:
+            logdata = dict()
+            logdata['exc'] = exc
+            log('E45', logdata)
+            return
+        try:
+            manager.apply(self.units)
+        except Exception as exc:
+            logdata = dict()
+            logdata['units'] = [unit.unit_name for unit in self.units]
+            logdata['exc'] = exc
+            log('E45', logdata)
+        finally:
+            manager.close()
 
     def apply(self):
         '''
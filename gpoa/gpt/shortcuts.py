@@ -20,6 +20,7 @@ from pathlib import Path
 import stat
 import logging
 from enum import Enum
+from functools import lru_cache
 
 from xml.etree import ElementTree
 from xdg.DesktopEntry import DesktopEntry
@@ -28,6 +29,7 @@ import json
 from util.windows import transform_windows_path
 from util.xml import get_xml_root
 from util.paths import get_desktop_files_directory
+from util.util import write_file_if_changed
 
 class TargetType(Enum):
     FILESYSTEM = 'FILESYSTEM'
@@ -117,8 +119,17 @@ def json2sc(json_str):
     return sc
 
 def find_desktop_entry(binary_path):
-    desktop_dir = get_desktop_files_directory()
     binary_name = ''.join(binary_path.split('/')[-1])
+    return read_desktop_entry(binary_name)
+
+@lru_cache(maxsize=None)
+def read_desktop_entry(binary_name):
+    '''
+    Parse system-wide .desktop file for the binary. The result is cached
+    for the whole run since the same applications are referenced by
+    many shortcuts. The returned object must not be modified.
+    '''
+    desktop_dir = get_desktop_files_directory()
     desktop_file_path = Path(f"{desktop_dir}/{binary_name}.desktop")
 
     if desktop_file_path.exists():
@@ -128,6 +139,25 @@ def find_desktop_entry(binary_path):
 
     return None
 
+def render_desktop(desktop_entry):
+    '''
+    Render desktop entry into string exactly as DesktopEntry.write() does
+    so the result may be compared with the file on disk.
+    '''
+    groups = list(desktop_entry.content)
+    if desktop_entry.defaultGroup in desktop_entry.content:
+        groups.remove(desktop_entry.defaultGroup)
+        groups.insert(0, desktop_entry.defaultGroup)
+
+    result = list()
+    for name in groups:
+        result.append('[{}]\n'.format(name))
+        for key, value in desktop_entry.content[name].items():
+            result.append('{}={}\n'.format(key, value))
+        result.append('\n')
+
+    return ''.join(result)
+
 
 class shortcut:
     def __init__(self, dest, path, arguments, name=None, action=None, ttype=TargetType.FILESYSTEM):
@@ -290,37 +320,49 @@ class shortcut:
         '''
         Write .desktop file to disk using path 'dest'. Please note that
         .desktop files must have executable bit set in order to work in
-        GUI.
+        GUI. The file is left untouched if its content is up to date.
+
+        :return: True in case the file was changed
         '''
         sc = Path(dest)
         if sc.exists() and create_only:
-            return
+            return False
 
         if sc.exists() and read_firstly:
-            self.desktop(dest).write(dest)
+            desktop_file = self.desktop(dest)
         else:
-            self.desktop().write(dest)
+            desktop_file = self.desktop()
 
-        sc.chmod(sc.stat().st_mode | stat.S_IEXEC)
+        mode = stat.S_IMODE(sc.stat().st_mode) if sc.exists() else 0o644
+
+        return write_file_if_changed(dest, render_desktop(desktop_file), mode | stat.S_IEXEC)
 
     def _remove_desktop(self, dest):
         '''
         Remove .desktop file fromo disk using path 'dest'.
+
+        :return: True in case the file was removed
         '''
         sc = Path(dest)
         if sc.exists():
             sc.unlink()
+            return True
+        return False
 
     def apply_desktop(self, dest):
         '''
         Apply .desktop file by action.
+
+        :return: True in case the file on disk was changed
         '''
         if self.action == 'U':
-            self._write_desktop(dest, read_firstly=True)
+            return self._write_desktop(dest, read_firstly=True)
         elif self.action == 'D':
-            self._remove_desktop(dest)
+            return self._remove_desktop(dest)
         elif self.action == 'R':
-            self._remove_desktop(dest)
-            self._write_desktop(dest)
+            # Replace is the same as writing the fresh file, the file
+            # is not touched when its content is already up to date.
+            return self._write_desktop(dest)
         elif self.action == 'C':
-            self._write_desktop(dest, create_only=True)
+            return self._write_desktop(dest, create_only=True)
+        return False
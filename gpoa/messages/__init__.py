@@ -19,7 +19,7 @@
 
 import gettext
 
-def info_code(code):
+def info_messages():
     info_ids = dict()
     info_ids[1] = 'Got GPO list for username'
     info_ids[2] = 'Got GPO'
@@ -32,9 +32,9 @@ def info_code(code):
     info_ids[9] = 'Set user property to'
     info_ids[10] = 'The line in the configuration file was cleared'
 
-    return info_ids.get(code, 'Unknown info code')
+    return info_ids
 
-def error_code(code):
+def error_messages():
     error_ids = dict()
     error_ids[1] = 'Insufficient permissions to run gpupdate'
     error_ids[2] = 'gpupdate will not be started'
@@ -107,9 +107,11 @@ def error_code(code):
     error_ids[70] = 'Error getting key value'
     error_ids[71] = 'Failed to update dconf database'
     error_ids[72] = 'Exception occurred while updating dconf database'
-    return error_ids.get(code, 'Unknown error code')
+    error_ids[73] = 'Failed to save registry snapshot'
+    error_ids[74] = 'Failed to update script cache entry'
+    return error_ids
 
-def debug_code(code):
+def debug_messages():
     debug_ids = dict()
     debug_ids[1] = 'The GPOA process was started for user'
     debug_ids[2] = 'Username is not specified - will use username of the current process'
@@ -321,10 +323,48 @@ def debug_code(code):
     debug_ids[208] = 'No entry found for the specified path'
     debug_ids[209] = 'Creating an ini file with policies for dconf'
     debug_ids[210] = 'GPO version was not found'
+    debug_ids[211] = 'GSettings policy is not changed, skipping schemas recompilation'
+    debug_ids[212] = 'dconf locks and profile are not changed, skipping dconf update'
+    debug_ids[213] = 'Updating dconf databases changed during the run'
+    debug_ids[214] = 'No dconf databases were changed, skipping dconf update'
+    debug_ids[215] = 'dconf policy ini-file is not changed'
+    debug_ids[216] = 'Saved binary snapshot of registry'
+    debug_ids[217] = 'Registry snapshot is not available, will read dconf'
+    debug_ids[218] = 'Loaded binary snapshot of registry'
+    debug_ids[219] = 'Control is already in requested state'
+    debug_ids[220] = 'Systemd unit is already in the desired state'
+    debug_ids[221] = 'Waiting for systemd jobs to finish'
+    debug_ids[222] = 'Desktop files database is up to date'
+    debug_ids[223] = 'File is up to date'
+    debug_ids[224] = 'File operation finished'
+    debug_ids[225] = 'Several file operations target the same file, running them in policy order'
+    debug_ids[226] = 'File operations finished'
+    debug_ids[227] = 'Ini-file removed'
+    debug_ids[228] = 'Ini-file written'
+    debug_ids[229] = 'Ini-file not changed'
+    debug_ids[230] = 'Browser policies file is up to date'
+    debug_ids[231] = 'Polkit rules are not changed'
+    debug_ids[232] = 'Automount maps are not changed'
+    debug_ids[233] = 'Automount maps changed, reloading autofs'
+    debug_ids[234] = 'Network share is up to date'
+    debug_ids[235] = 'Unable to get the list of network shares'
+    debug_ids[236] = 'APT package lists are up to date, skipping update'
+    debug_ids[237] = 'Batch package transaction failed, applying packages one by one'
+    debug_ids[238] = 'Script cache entry is up to date'
+    debug_ids[239] = 'Updating script cache entry'
+    debug_ids[240] = 'Removing stale script cache entry'
+    debug_ids[241] = 'Printer queue is up to date'
+    debug_ids[242] = 'Adding printer queue'
+    debug_ids[243] = 'Modifying printer queue'
+    debug_ids[244] = 'Deleting printer queue which is no longer in the policy'
+    debug_ids[245] = 'Reusing D-Bus session bus of the user'
+    debug_ids[246] = 'Starting private D-Bus session bus on demand'
+    debug_ids[247] = 'D-Bus session bus usage by user context runs'
+    debug_ids[248] = 'Printer queue is still managed for another scope, keeping it'
 
-    return debug_ids.get(code, 'Unknown debug code')
+    return debug_ids
 
-def warning_code(code):
+def warning_messages():
     warning_ids = dict()
     warning_ids[1] = (
         'Unable to perform gpupdate for non-existent user, '
@@ -356,36 +396,79 @@ def warning_code(code):
     warning_ids[22] = 'The user setting was not installed, conflict with computer setting'
     warning_ids[23] = 'Action for ini file failed'
     warning_ids[24] = 'Couldn\'t get the uid'
+    warning_ids[25] = 'Registry snapshot is invalid, will read dconf'
+    warning_ids[26] = 'Timed out waiting for systemd jobs'
+    warning_ids[27] = 'Failed to configure printer queue'
 
 
-    return warning_ids.get(code, 'Unknown warning code')
+    return warning_ids
 
-def fatal_code(code):
+def fatal_messages():
     fatal_ids = dict()
     fatal_ids[1] = 'Unable to refresh GPO list'
     fatal_ids[2] = 'Error getting GPTs for machine'
     fatal_ids[3] = 'Error getting GPTs for user'
 
-    return fatal_ids.get(code, 'Unknown fatal code')
+    return fatal_ids
+
+# Message catalog is built once at import
+message_catalog = dict()
+message_catalog['I'] = info_messages()
+message_catalog['E'] = error_messages()
+message_catalog['D'] = debug_messages()
+message_catalog['W'] = warning_messages()
+message_catalog['F'] = fatal_messages()
+
+unknown_messages = dict()
+unknown_messages['I'] = 'Unknown info code'
+unknown_messages['E'] = 'Unknown error code'
+unknown_messages['D'] = 'Unknown debug code'
+unknown_messages['W'] = 'Unknown warning code'
+unknown_messages['F'] = 'Unknown fatal code'
+
+def info_code(code):
+    return message_catalog['I'].get(code, unknown_messages['I'])
+
+def error_code(code):
+    return message_catalog['E'].get(code, unknown_messages['E'])
+
+def debug_code(code):
+    return message_catalog['D'].get(code, unknown_messages['D'])
+
+def warning_code(code):
+    return message_catalog['W'].get(code, unknown_messages['W'])
+
+def fatal_code(code):
+    return message_catalog['F'].get(code, unknown_messages['F'])
 
 def get_message(code):
-    retstr = 'Unknown message type, no message assigned'
+    mtype = code[0:1]
+    if mtype not in message_catalog:
+        return 'Unknown message type, no message assigned'
 
-    if code.startswith('E'):
-        retstr = error_code(int(code[1:]))
-    if code.startswith('I'):
-        retstr = info_code(int(code[1:]))
-    if code.startswith('D'):
-        retstr = debug_code(int(code[1:]))
-    if code.startswith('W'):
-        retstr = warning_code(int(code[1:]))
-    if code.startswith('F'):
-        retstr = fatal_code(int(code[1:]))
+    return message_catalog[mtype].get(int(code[1:]), unknown_messages[mtype])
 
-    return retstr
+# Translated messages are cached per text domain as the domain is bound
+# after the first messages may be logged
+_translated = dict()
+
+def message_text(code):
+    '''
+    Get the translated message without the code prefix.
+    '''
+    key = (code, gettext.textdomain())
+    text = _translated.get(key)
+    if text is None:
+        text = gettext.gettext(get_message(code))
+        _translated[key] = text
+
+    return text
+
+def full_code(code):
+    return code[0:1] + code[1:].rjust(5, '0')
 
 def message_with_code(code):
-    retstr = '[' + code[0:1] + code[1:].rjust(5, '0') + ']| ' + gettext.gettext(get_message(code))
+    retstr = '[' + full_code(code) + ']| ' + message_text(code)
 
     return retstr
 
@@ -16,20 +16,42 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import hashlib
 import subprocess
 from pathlib import Path
-from util.util import string_to_literal_eval, touch_file, get_uid_by_username
+from util.util import (
+      string_to_literal_eval
+    , touch_file
+    , get_uid_by_username
+    , read_file_if_exists
+    , atomic_write_file
+)
+from util.paths import get_dconf_config_hash_path, get_dconf_config_snapshot_path
+from .dconf_snapshot import save_registry_snapshot, load_registry_snapshot
 from util.logging import log
 import re
 
 
 class PregDconf():
+    '''
+    Registry value record. Lots of these objects are created while
+    filtering the registry so the record is slotted and hive_key is
+    built only when requested.
+    '''
+    __slots__ = ('keyname', 'valuename', 'type', 'data', '_hive_key')
+
     def __init__(self, keyname, valuename, type_preg, data):
         self.keyname = keyname
         self.valuename = valuename
-        self.hive_key = '{}/{}'.format(self.keyname, self.valuename)
         self.type = type_preg
         self.data = data
+        self._hive_key = None
+
+    @property
+    def hive_key(self):
+        if self._hive_key is None:
+            self._hive_key = '{}/{}'.format(self.keyname, self.valuename)
+        return self._hive_key
 
 
 class gplist(list):
@@ -59,6 +81,7 @@ class Dconf_registry():
     __dconf_dict = dict()
     _username = None
     _envprofile = None
+    _dconf_dirty = set()
 
     list_keys = list()
     _info = dict()
@@ -157,6 +180,30 @@ class Dconf_registry():
             logdata['exc'] = exc
             log('E72', logdata)
 
+    @classmethod
+    def mark_dconf_dirty(cls, db_name):
+        '''
+        Remember dconf database which keyfiles were changed during the run
+        in order to compile it once by flush_dconf_update().
+        '''
+        cls._dconf_dirty.add(db_name)
+
+    @classmethod
+    def flush_dconf_update(cls):
+        '''
+        Run single dconf update for all databases touched during the run.
+        dconf update compiles only databases which keyfile directories are
+        newer than the compiled ones so unrelated databases are not rebuilt.
+        '''
+        logdata = dict()
+        logdata['databases'] = sorted(cls._dconf_dirty)
+        if not cls._dconf_dirty:
+            log('D214', logdata)
+            return
+        log('D213', logdata)
+        cls.dconf_update()
+        cls._dconf_dirty.clear()
+
     @classmethod
     def check_profile_template(cls):
         if Path(cls.__template_file).exists():
@@ -199,6 +246,26 @@ class Dconf_registry():
         return cls.get_dictionary_from_dconf(cls._policies_path, cls._policies_win_path)
 
 
+    @classmethod
+    def get_policies_from_snapshot(cls):
+        '''
+        Build registry view from binary snapshots saved by the backend.
+        Machine policies take precedence over user ones like they do in
+        the user's dconf profile. None is returned in case any of the
+        needed snapshots is unavailable.
+        '''
+        uid = get_uid_by_username(cls._username) if cls._username else None
+        machine_registry = load_policy_snapshot(None)
+        if machine_registry is None or not uid:
+            return machine_registry
+
+        user_registry = load_policy_snapshot(uid)
+        if user_registry is None:
+            return None
+        update_dict(user_registry, machine_registry)
+        return user_registry
+
+
     @classmethod
     def get_dictionary_from_dconf(self, *startswith_list):
         output_dict = {}
@@ -258,7 +325,9 @@ class Dconf_registry():
             if Dconf_registry.__dconf_dict_flag:
                 result = Dconf_registry.__dconf_dict
             else:
-                Dconf_registry.__dconf_dict = Dconf_registry.get_policies_from_dconf()
+                Dconf_registry.__dconf_dict = Dconf_registry.get_policies_from_snapshot()
+                if Dconf_registry.__dconf_dict is None:
+                    Dconf_registry.__dconf_dict = Dconf_registry.get_policies_from_dconf()
                 result = Dconf_registry.__dconf_dict
                 Dconf_registry.__dconf_dict_flag = True
         return result
@@ -274,13 +343,17 @@ class Dconf_registry():
         logdata = dict()
         result = Dconf_registry.get_storage(dictionary)
 
-        keys = path.split("\\") if "\\" in path else path.split("/")
-        key = '/'.join(keys[:-1]) if keys[0] else '/'.join(keys[:-1])[1:]
+        separator = '\\' if '\\' in path else '/'
+        key, _, valuename = path.rpartition(separator)
+        if key.startswith(separator):
+            key = key[1:]
+        if separator != '/':
+            key = key.replace(separator, '/')
 
-        if isinstance(result, dict) and key in result.keys():
-            data = result.get(key).get(keys[-1])
+        if isinstance(result, dict) and key in result:
+            data = result.get(key).get(valuename)
             return PregDconf(
-                key, convert_string_dconf(keys[-1]), find_preg_type(data), data)
+                key, convert_string_dconf(valuename), find_preg_type(data), data)
         else:
             logdata['path'] = path
             log('D208', logdata)
@@ -409,10 +482,11 @@ class Dconf_registry():
 
 def filter_dict_keys(starting_string, input_dict):
     result = dict()
+    start_list = remove_empty_values(_path_split_re.split(starting_string))
+    start_len = len(start_list)
     for key in input_dict:
-        key_list = remove_empty_values(re.split(r'\\|/', key))
-        start_list = remove_empty_values(re.split(r'\\|/', starting_string))
-        if key_list[:len(start_list)] == start_list:
+        key_list = remove_empty_values(_path_split_re.split(key))
+        if key_list[:start_len] == start_list:
             result[key] = input_dict.get(key)
 
     return result
@@ -500,30 +574,72 @@ def load_preg_dconf(pregfile, pathfile, policy_name, username, version=None):
     update_dict(Dconf_registry.global_registry_dict, dd)
 
 
-def create_dconf_ini_file(filename, data):
+def render_dconf_ini(data):
+    '''
+    Render an ini-file based on a dictionary of dictionaries. Sections
+    and keys are sorted in order to get the same output for the same
+    policies regardless of GPO merge order.
+    '''
+    lines = list()
+    for section in sorted(data, key=ini_sort_key):
+        lines.append(f'[{section}]\n')
+        section_data = data[section]
+        for key in sorted(section_data, key=ini_sort_key):
+            value = section_data[key]
+            if isinstance(value, int):
+                lines.append(f'{key} = {value}\n')
+            else:
+                lines.append(f'{key} = "{value}"\n')
+        lines.append('\n')
+    return ''.join(lines)
+
+
+def ini_sort_key(key):
+    if isinstance(key, int):
+        return (0, key, '')
+    return (1, 0, str(key))
+
+
+def get_dconf_ini_hash(hash_filename):
+    '''
+    Get the checksum of dconf policy ini-file recorded on the last run.
+    Tools may compare it with the checksum they saw before in order to
+    cheaply detect changed policies.
+    '''
+    content = read_file_if_exists(hash_filename)
+    return content.strip() if content else None
+
+
+def create_dconf_ini_file(filename, data, hash_filename=None):
     '''
     Create an ini-file based on a dictionary of dictionaries.
     Args:
         data (dict): The dictionary of dictionaries containing the data for the ini-file.
         filename (str): The filename to save the ini-file.
+        hash_filename (str): The filename to record the checksum of the ini-file.
     Returns:
-        None
+        True in case the ini-file was written and False otherwise
     Raises:
         None
     '''
-    with open(filename, 'w') as file:
-        for section, section_data in data.items():
-            file.write(f'[{section}]\n')
-            for key, value in section_data.items():
-                if isinstance(value, int):
-                    file.write(f'{key} = {value}\n')
-                else:
-                    file.write(f'{key} = "{value}"\n')
-            file.write('\n')
+    content = render_dconf_ini(data)
+    digest = hashlib.sha256(content.encode('utf-8')).hexdigest()
     logdata = dict()
     logdata['path'] = filename
+    logdata['sha256'] = digest
+
+    if (hash_filename
+        and get_dconf_ini_hash(hash_filename) == digest
+        and Path(filename).exists()):
+        log('D215', logdata)
+        return False
+
+    atomic_write_file(filename, content)
+    if hash_filename:
+        atomic_write_file(hash_filename, digest + '\n')
     log('D209', logdata)
-    Dconf_registry.dconf_update()
+    Dconf_registry.mark_dconf_dirty(get_dconf_db_name(filename))
+    return True
 
 def clean_data(data):
     try:
@@ -543,20 +659,26 @@ def check_data(data, t_data):
         return data
     return clean_data(data)
 
+_path_split_re = re.compile(r'\\|/')
+
+# Characters which are not allowed in dconf key names are replaced by
+# macros on load and converted back on read.
+_dconf_macros = {
+    '#': '%sharp%',
+    ';': '%semicolon%',
+    '//': '%doubleslash%'
+}
+_dconf_macros.update({value: key for key, value in list(_dconf_macros.items())})
+_dconf_macros_re = re.compile('|'.join(re.escape(key) for key in _dconf_macros))
+
 def convert_string_dconf(input_string):
-    macros = {
-        '#': '%sharp%',
-        ';': '%semicolon%',
-        '//': '%doubleslash%'
-    }
-    output_string = input_string
-    for key, value in macros.items():
-        if key in input_string:
-            output_string = input_string.replace(key, value)
-        elif value in input_string:
-            output_string = input_string.replace(value, key)
-
-    return output_string
+    if not isinstance(input_string, str):
+        return input_string
+    # Most of the names have nothing to convert so avoid regex machinery
+    if ('#' not in input_string and ';' not in input_string
+        and '%' not in input_string and '//' not in input_string):
+        return input_string
+    return _dconf_macros_re.sub(lambda match: _dconf_macros[match.group(0)], input_string)
 
 def remove_empty_values(input_list):
     return list(filter(None, input_list))
@@ -575,6 +697,48 @@ def flatten_dictionary(input_dict, result=None, current_key=''):
 
     return result
 
+def save_policy_snapshot(uid, data):
+    '''
+    Save binary snapshot of registry dictionary next to the checksum of
+    dconf policy ini-file it was rendered to.
+    '''
+    try:
+        ini_hash = get_dconf_ini_hash(get_dconf_config_hash_path(uid))
+        if ini_hash:
+            save_registry_snapshot(get_dconf_config_snapshot_path(uid), data, ini_hash)
+    except Exception as exc:
+        logdata = dict()
+        logdata['uid'] = uid
+        logdata['exc'] = exc
+        log('E73', logdata)
+
+
+def load_policy_snapshot(uid):
+    '''
+    Load binary snapshot of registry dictionary for the specified UID
+    (or machine in case of None) if it matches dconf policy ini-file.
+    '''
+    try:
+        ini_hash = get_dconf_ini_hash(get_dconf_config_hash_path(uid))
+        return load_registry_snapshot(get_dconf_config_snapshot_path(uid), ini_hash)
+    except Exception as exc:
+        logdata = dict()
+        logdata['uid'] = uid
+        logdata['exc'] = exc
+        log('W25', logdata)
+    return None
+
+
+def get_dconf_db_name(filename):
+    '''
+    Get the name of dconf database by the path to its keyfile which is
+    placed in /etc/dconf/db/<name>.d directory.
+    '''
+    dirname = Path(filename).parent.name
+    if dirname == 'locks':
+        dirname = Path(filename).parent.parent.name
+    return dirname[:-2] if dirname.endswith('.d') else dirname
+
 def get_dconf_envprofile():
     dconf_envprofile = {'default': {'DCONF_PROFILE': 'default'},
                     'local': {'DCONF_PROFILE': 'local'},
@@ -0,0 +1,121 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2026 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import hashlib
+import marshal
+import mmap
+import os
+import struct
+import sys
+
+from util.util import atomic_write_file
+from util.logging import log
+
+# Snapshot layout: fixed size header followed by marshalled registry
+# dictionary. Header holds magic, snapshot format version, Python
+# version the payload was marshalled with, SHA-256 of payload, SHA-256
+# of dconf policy ini-file the snapshot corresponds to and payload size.
+_magic = b'GPOAREG\x00'
+_format_version = 1
+_header = struct.Struct('<8sIHH32s64sQ')
+
+
+def save_registry_snapshot(filename, registry, ini_hash):
+    '''
+    Save binary snapshot of merged registry dictionary.
+    '''
+    payload = marshal.dumps(registry)
+    header = _header.pack(
+          _magic
+        , _format_version
+        , sys.version_info.major
+        , sys.version_info.minor
+        , hashlib.sha256(payload).digest()
+        , ini_hash.encode('ascii')
+        , len(payload))
+    atomic_write_file(filename, header + payload)
+    logdata = dict()
+    logdata['path'] = filename
+    logdata['size'] = len(payload)
+    log('D216', logdata)
+
+
+def load_registry_snapshot(filename, ini_hash):
+    '''
+    Load binary snapshot of merged registry dictionary. None is returned
+    in case the snapshot is absent, not owned by root, corrupted or does
+    not correspond to the current dconf policy ini-file.
+    '''
+    logdata = dict()
+    logdata['path'] = filename
+    try:
+        with open(filename, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            if stat.st_uid != 0 or stat.st_mode & 0o022:
+                logdata['reason'] = 'not owned by root or writable by others'
+                log('W25', logdata)
+                return None
+            if stat.st_size < _header.size:
+                logdata['reason'] = 'truncated'
+                log('W25', logdata)
+                return None
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return _parse_snapshot(mm, ini_hash, logdata)
+    except FileNotFoundError:
+        log('D217', logdata)
+    except Exception as exc:
+        logdata['exc'] = exc
+        log('W25', logdata)
+
+    return None
+
+
+def _parse_snapshot(buffer, ini_hash, logdata):
+    (magic, version, major, minor, digest,
+        snapshot_ini_hash, length) = _header.unpack_from(buffer, 0)
+
+    if magic != _magic or version != _format_version:
+        logdata['reason'] = 'unknown format'
+        log('W25', logdata)
+        return None
+    if (major, minor) != sys.version_info[:2]:
+        logdata['reason'] = 'made by another Python version'
+        log('D217', logdata)
+        return None
+    if not ini_hash or snapshot_ini_hash != ini_hash.encode('ascii'):
+        logdata['reason'] = 'stale'
+        log('D217', logdata)
+        return None
+    if _header.size + length != len(buffer):
+        logdata['reason'] = 'truncated'
+        log('W25', logdata)
+        return None
+
+    payload = memoryview(buffer)[_header.size:]
+    try:
+        if hashlib.sha256(payload).digest() != digest:
+            logdata['reason'] = 'checksum mismatch'
+            log('W25', logdata)
+            return None
+        registry = marshal.loads(payload)
+    finally:
+        payload.release()
+
+    log('D218', logdata)
+    return registry
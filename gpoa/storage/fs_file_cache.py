@@ -20,6 +20,7 @@
 import os
 import os.path
 import tempfile
+import threading
 from pathlib import Path
 import smbc
 
@@ -43,9 +44,17 @@ class fs_file_cache:
             self.storage_uri = file_cache_dir()
         logdata = dict({'cache_file': self.storage_uri})
         log('D20', logdata)
-        self.samba_context = smbc.Context(use_kerberos=1)
+        # libsmbclient context must not be shared between threads
+        self.thread_data = threading.local()
+        self.thread_data.samba_context = smbc.Context(use_kerberos=1)
                 #, debug=10)
 
+    @property
+    def samba_context(self):
+        if not hasattr(self.thread_data, 'samba_context'):
+            self.thread_data.samba_context = smbc.Context(use_kerberos=1)
+        return self.thread_data.samba_context
+
     def store(self, uri, destfile = None):
         try:
             uri_path = UNCPath(uri)
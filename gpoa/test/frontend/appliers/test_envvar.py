@@ -0,0 +1,107 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2026 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+
+import os
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+
+from gpt.envvars import envvar
+
+
+def make_envvar(name, value, action):
+    obj = envvar(name, value)
+    obj.action = action
+    return obj
+
+class EnvvarTestCase(unittest.TestCase):
+    '''
+    Check edits of /etc/gpupdate/environment and ~/.gpupdate_environment
+    '''
+    initial = ('# Managed by gpupdate\n'
+        'EDITOR DEFAULT="vi"\n'
+        '\n'
+        'PAGER DEFAULT="less"\n'
+        'LANG DEFAULT="C"\n')
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def read(self, filename):
+        with open(filename) as f:
+            return f.read()
+
+    def apply(self, username, envvars):
+        from frontend.appliers.envvar import Envvar
+
+        Envvar(envvars, username).act()
+
+    def system_file(self):
+        return unittest.mock.patch('frontend.appliers.envvar.system_envvar_file',
+            os.path.join(self.tmpdir, 'environment'))
+
+    def test_system_file_actions(self):
+        filename = os.path.join(self.tmpdir, 'environment')
+        with open(filename, 'w') as f:
+            f.write(self.initial)
+        with self.system_file():
+            self.apply('root', [
+                  make_envvar('EDITOR', 'nano', 'C')
+                , make_envvar('PAGER', 'more', 'U')
+                , make_envvar('LANG', '', 'D')
+                , make_envvar('BROWSER', 'firefox', 'R')
+            ])
+        self.assertEqual(self.read(filename), '# Managed by gpupdate\n'
+            'EDITOR DEFAULT="vi"\n'
+            '\n'
+            'PAGER DEFAULT="more"\n'
+            'BROWSER DEFAULT="firefox"\n')
+
+    def test_system_file_unchanged(self):
+        filename = os.path.join(self.tmpdir, 'environment')
+        with open(filename, 'w') as f:
+            f.write(self.initial)
+        os.utime(filename, ns=(0, 0))
+        with self.system_file():
+            self.apply('root', [
+                  make_envvar('EDITOR', 'vi', 'U')
+                , make_envvar('LANG', 'C', 'C')
+                , make_envvar('TERM', '', 'D')
+            ])
+        self.assertEqual(os.stat(filename).st_mtime_ns, 0)
+        self.assertEqual(self.read(filename), self.initial)
+
+    @unittest.mock.patch('frontend.appliers.envvar.get_homedir')
+    @unittest.mock.patch('frontend.appliers.envvar.expand_windows_var')
+    def test_user_file(self, expand_mock, homedir_mock):
+        homedir_mock.return_value = self.tmpdir
+        expand_mock.side_effect = lambda text, username: text.replace('%HOME%', self.tmpdir)
+        self.apply('user', [
+              make_envvar('PROJECTS', '%HOME%\\projects', 'C')
+            , make_envvar('PAGER', 'less', 'C')
+            , make_envvar('PAGER', 'most', 'R')
+        ])
+        self.assertEqual(self.read(os.path.join(self.tmpdir, '.gpupdate_environment')),
+            'PROJECTS DEFAULT="{}/projects"\n'
+            'PAGER DEFAULT="most"\n'.format(self.tmpdir))
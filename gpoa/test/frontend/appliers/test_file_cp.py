@@ -0,0 +1,104 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2026 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+from pathlib import Path
+
+from gpt.files import fileentry
+
+
+def make_fileentry(fromPath, targetPath, action):
+    obj = fileentry(fromPath)
+    obj.set_action(action)
+    obj.set_target_path(targetPath)
+    obj.set_read_only('0')
+    obj.set_archive('0')
+    obj.set_hidden('0')
+    obj.set_suppress('0')
+    obj.set_executable('0')
+    return obj
+
+class FilesPlannerTestCase(unittest.TestCase):
+    '''
+    Check ordering of the file operations expanded from Files.xml
+    '''
+    def setUp(self):
+        self.tmpdir = Path(tempfile.mkdtemp())
+        self.source = self.tmpdir.joinpath('source.txt')
+        self.source.write_text('data')
+        self.target_dir = self.tmpdir.joinpath('dir')
+        self.exe_check = unittest.mock.Mock()
+        self.exe_check.get_list_paths.return_value = list()
+        self.exe_check.get_list_markers.return_value = list()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def run_planner(self, files):
+        from frontend.appliers.file_cp import Files_planner
+
+        planner = Files_planner(files, None, self.exe_check)
+        planner.run()
+        return planner
+
+    def test_pattern_delete_after_create(self):
+        files = [
+              make_fileentry(str(self.source), str(self.target_dir.joinpath('a.txt')), 'C')
+            , make_fileentry(None, str(self.target_dir.joinpath('*.txt')), 'D')
+        ]
+        planner = self.run_planner(files)
+
+        self.assertEqual(planner.errors, list())
+        self.assertTrue(self.target_dir.is_dir())
+        self.assertFalse(self.target_dir.joinpath('a.txt').exists())
+
+    def test_create_after_pattern_delete(self):
+        self.target_dir.mkdir()
+        self.target_dir.joinpath('old.txt').write_text('old')
+        self.target_dir.joinpath('keep.conf').write_text('keep')
+        files = [
+              make_fileentry(None, str(self.target_dir.joinpath('*.txt')), 'D')
+            , make_fileentry(str(self.source), str(self.target_dir.joinpath('a.txt')), 'C')
+        ]
+        self.run_planner(files)
+
+        self.assertFalse(self.target_dir.joinpath('old.txt').exists())
+        self.assertTrue(self.target_dir.joinpath('keep.conf').exists())
+        self.assertEqual(self.target_dir.joinpath('a.txt').read_text(), 'data')
+
+    def test_plan_stages(self):
+        from frontend.appliers.file_cp import Files_planner
+
+        files = [
+              make_fileentry(str(self.source), str(self.target_dir.joinpath('a.txt')), 'C')
+            , make_fileentry(str(self.source), str(self.target_dir.joinpath('b.txt')), 'C')
+            , make_fileentry(None, str(self.target_dir.joinpath('*.txt')), 'D')
+            , make_fileentry(str(self.source), str(self.target_dir.joinpath('c.txt')), 'C')
+        ]
+        stages = Files_planner(files, None, self.exe_check).plan()
+
+        self.assertEqual([len(chains) for chains in stages], [2, 1, 1])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,81 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2026 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from frontend.appliers.folder import remove_dir_tree
+
+class RemoveDirTreeTestCase(unittest.TestCase):
+    '''
+    Check remove_dir_tree flags semantics
+    '''
+    def setUp(self):
+        self.tmpdir = Path(tempfile.mkdtemp())
+        self.outside = Path(tempfile.mkdtemp())
+        (self.outside / 'keep').write_text('keep')
+        self.root = self.tmpdir / 'root'
+        (self.root / 'sub' / 'deep').mkdir(parents=True)
+        (self.root / 'file').write_text('data')
+        (self.root / 'sub' / 'file').write_text('data')
+        (self.root / 'sub' / 'deep' / 'file').write_text('data')
+        (self.root / 'link').symlink_to(self.outside)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+        shutil.rmtree(self.outside)
+
+    def test_delete_everything(self):
+        content = remove_dir_tree(self.root, True, True, True)
+        self.assertEqual(content, [])
+        self.assertFalse(self.root.exists())
+        self.assertTrue((self.outside / 'keep').exists())
+
+    def test_delete_files_only(self):
+        content = remove_dir_tree(self.root, delete_files=True)
+        self.assertEqual(sorted(content), [self.root / 'sub'])
+        self.assertFalse((self.root / 'file').exists())
+        self.assertTrue((self.root / 'sub' / 'file').exists())
+
+    def test_keep_folders(self):
+        content = remove_dir_tree(self.root, True, False, True)
+        self.assertEqual(content, [])
+        self.assertTrue((self.root / 'sub' / 'deep').is_dir())
+        self.assertFalse((self.root / 'sub' / 'deep' / 'file').exists())
+
+    def test_keep_files(self):
+        content = remove_dir_tree(self.root, False, True, True)
+        self.assertEqual(sorted(content), sorted([
+              self.root / 'file'
+            , self.root / 'link'
+            , self.root / 'sub' / 'file'
+            , self.root / 'sub' / 'deep' / 'file'
+        ]))
+        self.assertTrue(self.root.is_dir())
+
+    def test_symlink_root(self):
+        link_root = self.tmpdir / 'link_root'
+        link_root.symlink_to(self.root)
+        content = remove_dir_tree(link_root, delete_files=True)
+        self.assertEqual(sorted(content), [link_root / 'sub'])
+        self.assertFalse((self.root / 'file').exists())
+        self.assertTrue((self.outside / 'keep').exists())
@@ -0,0 +1,98 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2026 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from frontend.appliers.kconfig import kconfig_file
+
+class KConfigTestCase(unittest.TestCase):
+    '''
+    Round-trip tests for KConfig rc-files reader and writer
+    '''
+    data_dir = 'test/frontend/appliers/data'
+    samples = ['kwinrc', 'plasma-org.kde.plasma.desktop-appletsrc']
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def load_sample(self, name):
+        path = os.path.join(self.tmpdir, name)
+        shutil.copyfile(os.path.join(self.data_dir, name), path)
+        with open(path) as f:
+            content = f.read()
+        return kconfig_file(path), content
+
+    def test_round_trip(self):
+        for sample in self.samples:
+            config, content = self.load_sample(sample)
+            self.assertEqual(config.render(), content)
+            self.assertFalse(config.write())
+
+    def test_replace_value_in_place(self):
+        config, content = self.load_sample('kwinrc')
+        config.set_value('Windows', 'BorderlessMaximizedWindows', 'true', True)
+        expected = content.replace(
+            'BorderlessMaximizedWindows=false',
+            'BorderlessMaximizedWindows[$i]=true')
+        self.assertEqual(config.render(), expected)
+
+    def test_unlock_value(self):
+        config, content = self.load_sample('kwinrc')
+        config.set_value('Plugins', 'blurEnabled', 'true')
+        expected = content.replace('blurEnabled[$i]=false', 'blurEnabled=true')
+        self.assertEqual(config.render(), expected)
+
+    def test_add_value_to_group(self):
+        config, content = self.load_sample('kwinrc')
+        config.set_value('Compositing', 'Backend', 'OpenGL')
+        config.set_value('Windows', 'Name', 'Windows')
+        expected = content.replace(
+            'OpenGLIsUnsafe=false\n',
+            'OpenGLIsUnsafe=false\nBackend=OpenGL\n').replace(
+            'Name[ru]=Окна\n',
+            'Name[ru]=Окна\nName=Windows\n')
+        self.assertEqual(config.render(), expected)
+
+    def test_add_group(self):
+        config, content = self.load_sample('kwinrc')
+        config.set_value('TabBox', 'LayoutName', 'thumbnail_grid', True)
+        expected = content + '\n[TabBox]\nLayoutName[$i]=thumbnail_grid\n'
+        self.assertEqual(config.render(), expected)
+
+    def test_nested_group(self):
+        config, content = self.load_sample('plasma-org.kde.plasma.desktop-appletsrc')
+        config.set_value('Containments][1][Wallpaper][org.kde.image][General',
+            'Image', '/usr/share/wallpapers/altlinux.png')
+        expected = content.replace(
+            'Image=/usr/share/wallpapers/Next/',
+            'Image=/usr/share/wallpapers/altlinux.png')
+        self.assertEqual(config.render(), expected)
+        self.assertTrue(config.write())
+        self.assertEqual(kconfig_file(config.path).render(), expected)
+
+    def test_escape_value(self):
+        config = kconfig_file(os.path.join(self.tmpdir, 'kdeglobals'))
+        config.set_value('General', 'Name', ' a\\b\n')
+        self.assertEqual(config.render(), '[General]\nName=\\sa\\\\b\\n\n')
@@ -0,0 +1,75 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2026 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from frontend.appliers.scripts_cache import scripts_cache
+
+class script_entry:
+    def __init__(self, number, path, args=None):
+        self.number = number
+        self.path = path
+        self.args = args
+
+class ScriptsCacheTestCase(unittest.TestCase):
+    '''
+    Check incremental synchronization of the scripts cache
+    '''
+    def setUp(self):
+        self.tmpdir = Path(tempfile.mkdtemp())
+        self.cache = self.tmpdir / 'cache'
+        self.first = self.tmpdir / 'first.sh'
+        self.second = self.tmpdir / 'second.sh'
+        self.first.write_text('#!/bin/sh\necho first\n')
+        self.second.write_text('#!/bin/sh\necho second\n')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def sync(self, scripts):
+        scripts_cache(self.cache, 0o700).sync(scripts)
+
+    def test_unchanged_scripts_are_kept(self):
+        self.sync({'STARTUP': [script_entry(1, str(self.first))]})
+        target = self.cache / 'STARTUP' / '00001_first.sh'
+        inode = target.stat().st_ino
+        self.sync({'STARTUP': [script_entry(1, str(self.first))]})
+        self.assertEqual(target.stat().st_ino, inode)
+        self.assertEqual(target.stat().st_mode & 0o777, 0o700)
+
+    def test_changed_script_is_replaced(self):
+        self.sync({'STARTUP': [script_entry(1, str(self.first))]})
+        self.first.write_text('#!/bin/sh\necho changed\n')
+        self.sync({'STARTUP': [script_entry(1, str(self.first), '-v')]})
+        target = self.cache / 'STARTUP' / '00001_first.sh'
+        self.assertEqual(target.read_text(), '#!/bin/sh\necho changed\n')
+        self.assertEqual((self.cache / 'STARTUP' / '00001_first.sh.arg' / 'arg').read_text(), '-v')
+
+    def test_removed_scripts_are_deleted(self):
+        self.sync({'STARTUP': [script_entry(1, str(self.first), '-v')
+            , script_entry(2, str(self.second))]
+            , 'SHUTDOWN': [script_entry(1, str(self.second))]})
+        self.sync({'STARTUP': [script_entry(2, str(self.second))], 'SHUTDOWN': []})
+        self.assertEqual(sorted(os.listdir(self.cache / 'STARTUP')), ['00002_second.sh'])
+        self.assertFalse((self.cache / 'SHUTDOWN').exists())
+
@@ -0,0 +1,100 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2026 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+
+import json
+import shutil
+import tempfile
+import unittest
+import unittest.mock
+from pathlib import Path
+
+
+class printer_record:
+    def __init__(self, server, name):
+        self.printer = json.dumps({'printer': {'path': '\\\\{}\\{} ({})'.format(server, name, name)}})
+
+def queue(name, server='srv', info=None):
+    return {'device-uri': 'smb://{}/{}'.format(server, name), 'printer-info': info or name}
+
+class ReconcilePrintersTestCase(unittest.TestCase):
+    '''
+    Check CUPS queues are changed only when they differ from the policy
+    '''
+    def setUp(self):
+        self.tmpdir = Path(tempfile.mkdtemp())
+        patcher = unittest.mock.patch('frontend.cups_applier.cache_dir', return_value=self.tmpdir)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(shutil.rmtree, self.tmpdir)
+
+    def write_state(self, scope, names):
+        state = {name: queue(name)['device-uri'] for name in names}
+        self.tmpdir.joinpath('cups_printers_{}.json'.format(scope)).write_text(json.dumps(state))
+
+    def read_state(self, scope):
+        return json.loads(self.tmpdir.joinpath('cups_printers_{}.json'.format(scope)).read_text())
+
+    def reconcile(self, existing, printers, scope):
+        from frontend.cups_applier import reconcile_printers
+
+        connection = unittest.mock.Mock()
+        connection.getPrinters.return_value = existing
+        reconcile_printers(connection, printers, scope)
+        return connection
+
+    def test_add_modify_keep_delete(self):
+        self.write_state('machine', ['keep', 'modify', 'stale'])
+        existing = {
+              'keep': queue('keep')
+            , 'modify': queue('modify', server='old')
+            , 'stale': queue('stale')
+            , 'local': queue('local')
+        }
+        printers = [
+              printer_record('srv', 'keep')
+            , printer_record('srv', 'modify')
+            , printer_record('srv', 'new')
+        ]
+        connection = self.reconcile(existing, printers, 'machine')
+
+        added = sorted(call.kwargs['name'] for call in connection.addPrinter.call_args_list)
+        self.assertEqual(added, ['modify', 'new'])
+        connection.deletePrinter.assert_called_once_with('stale')
+        self.assertEqual(sorted(self.read_state('machine')), ['keep', 'modify', 'new'])
+
+    def test_keep_queue_managed_by_other_scope(self):
+        self.write_state('machine', ['shared'])
+        self.write_state('user1', ['shared', 'own'])
+        existing = {
+              'shared': queue('shared')
+            , 'own': queue('own')
+        }
+        connection = self.reconcile(existing, [], 'user1')
+
+        connection.addPrinter.assert_not_called()
+        connection.deletePrinter.assert_called_once_with('own')
+        self.assertEqual(self.read_state('user1'), dict())
+
+        connection = self.reconcile(existing, [], 'machine')
+        connection.deletePrinter.assert_called_once_with('shared')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -20,6 +20,8 @@ import unittest
 import unittest.mock
 
 import os
+import stat
+import tempfile
 
 import util.paths
 import json
@@ -58,3 +60,22 @@ class GptShortcutsTestCase(unittest.TestCase):
         self.assertEqual(json_obj['Desktop Entry']['Type'], 'Link')
         self.assertEqual(json_obj['Desktop Entry']['URL'], 'smb://10.0.0.0/')
 
+
+    @unittest.mock.patch('util.paths.cache_dir')
+    def test_shortcut_write_unchanged(self, cdir_mock):
+        '''
+        Test that up to date .desktop file is not rewritten.
+        '''
+        cdir_mock.return_value = '/var/cache/gpupdate'
+
+        import gpt.shortcuts
+        testdata_path = '{}/test/gpt/data/Shortcuts.xml'.format(os.getcwd())
+        sc = gpt.shortcuts.read_shortcuts(testdata_path)
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            dest = os.path.join(tmpdir, 'Far.desktop')
+            self.assertTrue(sc[0].apply_desktop(dest))
+            self.assertTrue(os.stat(dest).st_mode & stat.S_IEXEC)
+            mtime = os.stat(dest).st_mtime_ns
+            self.assertFalse(sc[0].apply_desktop(dest))
+            self.assertEqual(os.stat(dest).st_mtime_ns, mtime)
@@ -0,0 +1,125 @@
+#
+# GPOA - GPO Applier for Linux
+#
+# Copyright (C) 2026 BaseALT Ltd.
+#
+# This program is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+
+
+import importlib.util
+import os
+import shutil
+import signal
+import tempfile
+import time
+import unittest
+from importlib.machinery import SourceFileLoader
+from pathlib import Path
+
+
+def load_scripts_runner():
+    path = str(Path(__file__).resolve().parents[1] / 'scripts_runner')
+    loader = SourceFileLoader('scripts_runner', path)
+    spec = importlib.util.spec_from_loader('scripts_runner', loader)
+    module = importlib.util.module_from_spec(spec)
+    loader.exec_module(module)
+    return module
+
+def sh(command):
+    return ['/bin/sh', '-c', command]
+
+def is_running(pid):
+    try:
+        with open('/proc/{}/stat'.format(pid)) as f:
+            state = f.read().rpartition(')')[2].split()[0]
+    except OSError:
+        return False
+    return state != 'Z'
+
+class ScriptsExecutorTestCase(unittest.TestCase):
+    '''
+    Check time budgets of the scripts runner. The scripts which must not
+    finish block on the FIFO nobody writes to so the results don't depend
+    on the host load.
+    '''
+    def setUp(self):
+        self.scripts_runner = load_scripts_runner()
+        self.scripts_runner.journal_stream_socket = '/nonexistent'
+        self.tmpdir = Path(tempfile.mkdtemp())
+        self.fifo = self.tmpdir / 'fifo'
+        os.mkfifo(self.fifo)
+        self.hang = sh('cat {} > /dev/null 2>&1'.format(self.fifo))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def run_scripts(self, commands, **kwargs):
+        executor = self.scripts_runner.Scripts_executor(**kwargs)
+        executor.print_line = lambda line: None
+        return executor.run(commands)
+
+    def get_statuses(self, commands, **kwargs):
+        return [result.status for result in self.run_scripts(commands, **kwargs)]
+
+    def read_pid(self):
+        return int((self.tmpdir / 'pid').read_text())
+
+    def test_script_timeout(self):
+        commands = [self.hang, sh('true'), self.hang, sh('true')]
+        statuses = self.get_statuses(commands, timeout=2, total_timeout=60)
+        self.assertEqual(statuses, ['timeout', 'done', 'timeout', 'done'])
+
+    def test_process_group_kill(self):
+        command = sh('{} & echo $! > {}/pid; wait'.format(self.hang[2], self.tmpdir))
+        statuses = self.get_statuses([command], timeout=1)
+        self.assertEqual(statuses, ['timeout'])
+        pid = self.read_pid()
+        for _ in range(50):
+            if not is_running(pid):
+                break
+            time.sleep(0.1)
+        self.assertFalse(is_running(pid))
+
+    def test_total_budget_skip(self):
+        statuses = self.get_statuses([self.hang, sh('true')], total_timeout=1)
+        self.assertEqual(statuses, ['timeout', 'skipped'])
+
+    def test_background_child(self):
+        # The script is done as soon as it exits even though its child
+        # still runs in background holding stdout of the script
+        self.scripts_runner.kill_timeout = 60
+        command = sh('cat {} & echo $! > {}/pid'.format(self.fifo, self.tmpdir))
+        results = self.run_scripts([command], total_timeout=300)
+        pid = self.read_pid()
+        try:
+            self.assertEqual(results[0].status, 'done')
+            self.assertLess(results[0].duration, 30)
+            self.assertTrue(is_running(pid))
+        finally:
+            os.kill(pid, signal.SIGKILL)
+
+    def test_parallel(self):
+        # Every script waits for all the others to start so they finish
+        # only in case they are run concurrently
+        marks = self.tmpdir / 'marks'
+        marks.mkdir()
+        commands = [sh('touch {0}/{1}; while [ $(ls {0} | wc -l) -lt 4 ]; do sleep 0.05; done'.format(marks, i))
+            for i in range(4)]
+        statuses = self.get_statuses(commands, pool_size=4, timeout=60)
+        self.assertEqual(statuses, ['done'] * 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -20,13 +20,19 @@ import logging
 import logging.handlers
 from enum import IntEnum
 
-from messages import message_with_code
-from .logging import slogm
+from .config import GPConfig
+from .logging import (
+      log
+    , json_formatter
+    , journald_handler
+)
 
 
-def set_loglevel(loglevel_num=None):
+def set_loglevel(loglevel_num=None, backend=None):
     '''
-    Set the log level global value.
+    Set the log level global value and log backend which may be 'text',
+    'json' to print JSON lines or 'journald' to send structured records
+    to the journal.
     '''
     format_message = '%(message)s'
     formatter = logging.Formatter(format_message)
@@ -48,15 +54,24 @@ def set_loglevel(loglevel_num=None):
     logger = logging.getLogger()
     logger.setLevel(log_level)
 
+    if not backend:
+        backend = GPConfig().get_log_backend()
+
     log_stdout = logging.StreamHandler()
     log_stdout.setLevel(log_level)
-    log_stdout.setFormatter(formatter)
+    if backend == 'json':
+        log_stdout.setFormatter(json_formatter())
+    else:
+        log_stdout.setFormatter(formatter)
 
-    log_syslog = logging.handlers.SysLogHandler()
-    log_syslog.setLevel(logging.DEBUG)
-    log_syslog.setFormatter(formatter)
+    if backend == 'journald' and journald_handler.is_available():
+        log_system = journald_handler()
+    else:
+        log_system = logging.handlers.SysLogHandler()
+        log_system.setFormatter(formatter)
+    log_system.setLevel(logging.DEBUG)
 
-    logger.handlers = [log_stdout, log_syslog]
+    logger.handlers = [log_stdout, log_system]
 
 
 def process_target(target_name=None):
@@ -70,7 +85,7 @@ def process_target(target_name=None):
         target = target_name
 
     logdata = dict({'target': target})
-    logging.debug(slogm(message_with_code('D10'), logdata))
+    log('D10', logdata)
 
     return target.upper()
 
@@ -26,6 +26,8 @@ from .util import (
 
 class GPConfig:
     __config_path = '/etc/gpupdate/gpupdate.ini'
+    __apt_update_age = 3600
+    __log_backends = ['text', 'json', 'journald']
 
     def __init__(self, config_path=None):
         if config_path:
@@ -75,6 +77,29 @@ class GPConfig:
         self.full_config['gpoa']['local-policy'] = template_name
         self.write_config()
 
+    def get_apt_update_age(self):
+        '''
+        Fetch the age in seconds APT package lists are considered fresh
+        for and 'apt-get update' is not run.
+        '''
+        if 'gpoa' in self.full_config:
+            try:
+                return self.full_config['gpoa'].getint('apt-update-age', self.__apt_update_age)
+            except ValueError:
+                pass
+
+        return self.__apt_update_age
+
+    def get_log_backend(self):
+        '''
+        Fetch the name of the log backend from configuration file.
+        '''
+        if 'gpoa' in self.full_config:
+            if self.full_config['gpoa'].get('log-backend') in self.__log_backends:
+                return self.full_config['gpoa']['log-backend']
+
+        return 'text'
+
     def write_config(self):
         with open(self.__config_path, 'w') as config_file:
             self.full_config.write(config_file)
@@ -16,11 +16,17 @@
 # You should have received a copy of the GNU General Public License
 # along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import os
 import json
+import socket
 import datetime
 import logging
 
-from messages import message_with_code
+from messages import (
+      message_with_code
+    , message_text
+    , full_code
+)
 
 
 class encoder(json.JSONEncoder):
@@ -40,9 +46,10 @@ class slogm(object):
     '''
     Structured log message class
     '''
-    def __init__(self, message, kwargs=dict()):
+    def __init__(self, message, kwargs=dict(), code=None):
         self.message = message
         self.kwargs = kwargs
+        self.code = code
         if not self.kwargs:
             self.kwargs = dict()
 
@@ -54,24 +61,95 @@ class slogm(object):
 
         return result
 
-def log(message_code, data=None):
-    mtype = message_code[0]
+def get_record_fields(record):
+    '''
+    Split log record into code, message and data fields
+    '''
+    msg = record.msg
+    if isinstance(msg, slogm):
+        if msg.code:
+            return full_code(msg.code), message_text(msg.code), msg.kwargs
+        return None, str(msg.message), msg.kwargs
+    return None, record.getMessage(), dict()
 
-    if 'I' == mtype:
-        logging.info(slogm(message_with_code(message_code), data))
-        return
-    if 'W' == mtype:
-        logging.warning(slogm(message_with_code(message_code), data))
-        return
-    if 'E' == mtype:
-        logging.error(slogm(message_with_code(message_code), data))
-        return
-    if 'F' == mtype:
-        logging.fatal(slogm(message_with_code(message_code), data))
-        return
-    if 'D' == mtype:
-        logging.debug(slogm(message_with_code(message_code), data))
-        return
+class json_formatter(logging.Formatter):
+    '''
+    Format log records as JSON lines
+    '''
+    def format(self, record):
+        code, message, data = get_record_fields(record)
+        entry = dict()
+        entry['time'] = datetime.datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds')
+        entry['level'] = record.levelname
+        entry['code'] = code
+        entry['message'] = message
+        entry['data'] = data
+        return json.dumps(entry, ensure_ascii=False, default=str)
 
-    logging.error(slogm(message_with_code(message_code), data))
+class journald_handler(logging.Handler):
+    '''
+    Send log records to journald using its native protocol so message
+    code and data are stored as separate fields.
+    '''
+    __socket_path = '/run/systemd/journal/socket'
+    __priorities = {
+          logging.DEBUG: 7
+        , logging.INFO: 6
+        , logging.WARNING: 4
+        , logging.ERROR: 3
+        , logging.CRITICAL: 2
+    }
+
+    def __init__(self, identifier='gpoa'):
+        super().__init__()
+        self.identifier = identifier
+        self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+
+    @classmethod
+    def is_available(cls):
+        return os.path.exists(cls.__socket_path)
+
+    @staticmethod
+    def encode_field(name, value):
+        value = value.encode('utf-8')
+        if b'\n' not in value:
+            return name.encode() + b'=' + value + b'\n'
+        # Multiline values are prefixed with their length
+        return name.encode() + b'\n' + len(value).to_bytes(8, 'little') + value + b'\n'
+
+    def emit(self, record):
+        try:
+            code, message, data = get_record_fields(record)
+            fields = [
+                  ('MESSAGE', message if not code else '[{}]| {}'.format(code, message))
+                , ('PRIORITY', str(self.__priorities.get(record.levelno, 6)))
+                , ('SYSLOG_IDENTIFIER', self.identifier)
+            ]
+            if code:
+                fields.append(('GPOA_CODE', code))
+            if data:
+                fields.append(('GPOA_DATA', json.dumps(data, ensure_ascii=False, default=str)))
+            self.socket.sendto(b''.join(self.encode_field(name, value) for name, value in fields),
+                self.__socket_path)
+        except Exception:
+            self.handleError(record)
+
+    def close(self):
+        self.socket.close()
+        super().close()
+
+_log_levels = {
+      'I': logging.INFO
+    , 'W': logging.WARNING
+    , 'E': logging.ERROR
+    , 'F': logging.FATAL
+    , 'D': logging.DEBUG
+}
+
+def log(message_code, data=None):
+    level = _log_levels.get(message_code[0], logging.ERROR)
+    # Do not build the message in case it is filtered out anyway
+    if not logging.root.isEnabledFor(level):
+        return
 
+    logging.log(level, slogm(message_with_code(message_code), data, message_code))
@@ -99,6 +99,29 @@ def get_dconf_config_path(uid = None):
     else:
         return '/etc/dconf/db/policy.d/policy.ini'
 
+def get_dconf_config_hash_path(uid = None):
+    '''
+    Returns path to the file with checksum of dconf policy ini-file
+    written on the last run.
+    '''
+    dconf_cache = pathlib.Path.joinpath(cache_dir(), 'dconf')
+
+    if not dconf_cache.exists():
+        dconf_cache.mkdir(parents=True, exist_ok=True)
+
+    if uid:
+        return str(pathlib.Path.joinpath(dconf_cache, f'policy{uid}.sha256'))
+    else:
+        return str(pathlib.Path.joinpath(dconf_cache, 'policy.sha256'))
+
+def get_dconf_config_snapshot_path(uid = None):
+    '''
+    Returns path to the binary snapshot of registry merged on the
+    last run. It is kept outside of dconf keyfile directory because
+    dconf update parses every file there.
+    '''
+    return str(pathlib.Path(get_dconf_config_hash_path(uid)).with_suffix('.registry'))
+
 def get_desktop_files_directory():
     return '/usr/share/applications'
 
@@ -19,6 +19,7 @@
 
 import subprocess
 import rpm
+from functools import lru_cache
 
 
 def is_rpm_installed(rpm_name):
@@ -33,6 +34,19 @@ def is_rpm_installed(rpm_name):
 
     return False
 
+@lru_cache(maxsize=None)
+def get_installed_rpms():
+    '''
+    Get names of all the installed packages with single scan of RPM
+    database. The result is cached for the run.
+    '''
+    ts = rpm.TransactionSet()
+    names = set()
+    for hdr in ts.dbMatch():
+        name = hdr[rpm.RPMTAG_NAME]
+        names.add(name.decode() if isinstance(name, bytes) else name)
+    return frozenset(names)
+
 class Package:
 
     def __init__(self, package_name):
@@ -19,11 +19,18 @@
 import os
 import sys
 import pwd
+import json
+import stat
 import signal
 import subprocess
 import locale
 from .logging import log
 from .dbus import dbus_session
+from .paths import cache_dir
+from .util import (
+      read_file_if_exists
+    , write_file_if_changed
+)
 
 
 def set_privileges(username, uid, gid, groups, home):
@@ -62,10 +69,134 @@ def set_privileges(username, uid, gid, groups, home):
     log('D37', logdata)
 
 
+class user_session_bus:
+    '''
+    D-Bus session bus for the user context. The bus of the running user
+    session is reused and the private session daemon is started only in
+    case some applier requires the bus while the user has no session.
+    '''
+    def __init__(self, uid):
+        self.uid = uid
+        self.requested = False
+        self.dbus_pid = -1
+
+    def attach(self):
+        '''
+        Use the bus of the running user session if there is one.
+        '''
+        # The bus inherited from the parent process belongs to root
+        os.environ.pop('DBUS_SESSION_BUS_ADDRESS', None)
+        os.environ.pop('DBUS_SESSION_BUS_PID', None)
+
+        runtime_dir = '/run/user/{}'.format(self.uid)
+        bus_path = os.path.join(runtime_dir, 'bus')
+        try:
+            bus_stat = os.stat(bus_path)
+        except OSError:
+            return False
+        if not stat.S_ISSOCK(bus_stat.st_mode) or bus_stat.st_uid != self.uid:
+            return False
+
+        os.environ['DBUS_SESSION_BUS_ADDRESS'] = 'unix:path={}'.format(bus_path)
+        os.environ['XDG_RUNTIME_DIR'] = runtime_dir
+        log('D245', {'path': bus_path})
+        return True
+
+    def require(self):
+        '''
+        Make sure the session bus is available starting the private
+        D-Bus session daemon if needed.
+        '''
+        self.requested = True
+        if 'DBUS_SESSION_BUS_ADDRESS' in os.environ:
+            return
+
+        log('D246')
+        proc = subprocess.Popen(
+            'dbus-launch',
+            shell=True,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT)
+        for var in proc.stdout:
+            sp = var.decode('utf-8').split('=', 1)
+            os.environ[sp[0]] = sp[1][:-1]
+
+        # Save pid of dbus-daemon
+        self.dbus_pid = int(os.environ['DBUS_SESSION_BUS_PID'])
+
+    def get_usage(self):
+        if self.dbus_pid > 0:
+            return 'private'
+        if self.requested:
+            return 'session'
+        return 'none'
+
+    def stop(self):
+        '''
+        Kill the private D-Bus session daemon and dconf-service it spawned.
+        '''
+        if self.dbus_pid <= 0:
+            return
+
+        # Save pid of dconf-service
+        dconf_pid = -1
+        dconf_connection = "ca.desrt.dconf"
+        try:
+            session = dbus_session()
+            dconf_pid = session.get_connection_pid(dconf_connection)
+        except Exception:
+            pass
+
+        logdata = dict()
+        logdata['dbus_pid'] = self.dbus_pid
+        logdata['dconf_pid'] = dconf_pid
+        log('D56', logdata)
+        os.kill(self.dbus_pid, signal.SIGHUP)
+        if dconf_pid > 0:
+            os.kill(dconf_pid, signal.SIGTERM)
+        os.kill(self.dbus_pid, signal.SIGTERM)
+        self.dbus_pid = -1
+
+# Session bus of the forked user context process
+_session_bus = None
+
+def require_session_bus():
+    '''
+    Called by appliers which need the D-Bus session bus in user context.
+    '''
+    if _session_bus is not None:
+        _session_bus.require()
+
+def update_session_bus_stats(usage):
+    '''
+    Count user context runs which needed the session bus.
+    '''
+    stats_file = cache_dir() / 'dbus_session_stats.json'
+    stats = dict()
+    try:
+        stats = json.loads(read_file_if_exists(stats_file) or '{}')
+    except ValueError:
+        pass
+    for key in ('runs', 'session', 'private'):
+        if not isinstance(stats.get(key), int):
+            stats[key] = 0
+    stats['runs'] += 1
+    if usage in ('session', 'private'):
+        stats[usage] += 1
+    write_file_if_changed(str(stats_file), json.dumps(stats, sort_keys=True))
+    logdata = dict()
+    logdata['usage'] = usage
+    logdata['runs'] = stats['runs']
+    logdata['session_runs'] = stats['session']
+    logdata['private_runs'] = stats['private']
+    log('D247', logdata)
+
 def with_privileges(username, func):
     '''
     Run supplied function with privileges for specified username.
     '''
+    global _session_bus
+
     if not os.getuid() == 0:
         raise Exception('Not enough permissions to drop privileges')
 
@@ -78,10 +209,19 @@ def with_privileges(username, func):
     if not os.path.isdir(user_home):
         raise Exception('User home directory not exists')
 
+    usage_read, usage_write = os.pipe()
     pid = os.fork()
     if pid > 0:
+        os.close(usage_write)
         log('D54', {'pid': pid})
         waitpid, status = os.waitpid(pid, 0)
+        with os.fdopen(usage_read, 'rb') as usage_pipe:
+            usage = usage_pipe.read().decode()
+
+        try:
+            update_session_bus_stats(usage or 'none')
+        except Exception:
+            pass
 
         code = os.WEXITSTATUS(status)
         if code != 0:
@@ -89,55 +229,31 @@ def with_privileges(username, func):
 
         return
 
+    os.close(usage_read)
     # We need to return child error code to parent
     result = 0
-    dbus_pid = -1
-    dconf_pid = -1
+    _session_bus = user_session_bus(user_uid)
     try:
 
         # Drop privileges
         set_privileges(username, user_uid, user_gid, user_groups, user_home)
 
-        # Run the D-Bus session daemon in order D-Bus calls to work
-        proc = subprocess.Popen(
-            'dbus-launch',
-            shell=True,
-            stdout=subprocess.PIPE,
-            stderr=subprocess.STDOUT)
-        for var in proc.stdout:
-            sp = var.decode('utf-8').split('=', 1)
-            os.environ[sp[0]] = sp[1][:-1]
-
-        # Save pid of dbus-daemon
-        dbus_pid = int(os.environ['DBUS_SESSION_BUS_PID'])
+        # The private D-Bus session daemon is started by appliers
+        # requiring the bus in case the user has no running session
+        _session_bus.attach()
 
         # Run user appliers
         func()
 
-        # Save pid of dconf-service
-        dconf_connection = "ca.desrt.dconf"
-        try:
-            session = dbus_session()
-            dconf_pid = session.get_connection_pid(dconf_connection)
-        except Exception:
-            pass
-
     except Exception as exc:
         logdata = dict()
         logdata['msg'] = str(exc)
         log('E33', logdata)
         result = 1;
     finally:
-        logdata = dict()
-        logdata['dbus_pid'] = dbus_pid
-        logdata['dconf_pid'] = dconf_pid
-        log('D56', logdata)
-        if dbus_pid > 0:
-            os.kill(dbus_pid, signal.SIGHUP)
-        if dconf_pid > 0:
-            os.kill(dconf_pid, signal.SIGTERM)
-        if dbus_pid > 0:
-            os.kill(dbus_pid, signal.SIGTERM)
+        try:
+            os.write(usage_write, _session_bus.get_usage().encode())
+        finally:
+            _session_bus.stop()
 
     sys.exit(result)
-
@@ -21,6 +21,8 @@ import os
 import pwd
 import subprocess
 import re
+import stat
+import tempfile
 from pathlib import Path
 from .samba import smbopts
 import ast
@@ -196,3 +198,150 @@ def get_uid_by_username(username):
         return user_info.pw_uid
     except KeyError:
         return None
+
+def read_file_if_exists(filename, binary=False):
+    '''
+    Read the whole file returning None in case it is absent or unreadable.
+    '''
+    try:
+        with open(filename, 'rb' if binary else 'r') as f:
+            return f.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+def atomic_write_file(filename, content, mode=0o644):
+    '''
+    Write content into temporary file placed near the target and then
+    rename it over the target so readers never see partially written
+    data. Ownership of the replaced file is kept when running as root.
+    '''
+    path = Path(filename)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmpfile = tempfile.mkstemp('', '.{}.'.format(path.name), str(path.parent))
+    try:
+        with os.fdopen(fd, 'wb' if isinstance(content, bytes) else 'w') as f:
+            f.write(content)
+        os.chmod(tmpfile, mode)
+        if os.geteuid() == 0 and path.exists():
+            st = path.stat()
+            os.chown(tmpfile, st.st_uid, st.st_gid)
+        os.rename(tmpfile, str(path))
+    except:
+        tmppath = Path(tmpfile)
+        if tmppath.exists():
+            tmppath.unlink()
+        raise
+
+def write_file_if_changed(filename, content, mode=0o644):
+    '''
+    Atomically replace the file only in case its contents differ from
+    the supplied ones.
+
+    :return: True in case the file was written and False otherwise
+    '''
+    if read_file_if_exists(filename, isinstance(content, bytes)) == content:
+        return False
+    atomic_write_file(filename, content, mode)
+    return True
+
+def is_file_up_to_date(source, target):
+    '''
+    Check that target is the copy of the source. Files with the same size
+    and modification time are considered identical, otherwise content is
+    compared in case the sizes match.
+    '''
+    try:
+        src_stat = os.stat(source)
+        dst_stat = os.stat(target)
+    except OSError:
+        return False
+    if src_stat.st_size != dst_stat.st_size:
+        return False
+    if src_stat.st_mtime_ns == dst_stat.st_mtime_ns:
+        return True
+    blocksize = 1024 * 1024
+    with open(source, 'rb') as src, open(target, 'rb') as dst:
+        while True:
+            src_block = src.read(blocksize)
+            if src_block != dst.read(blocksize):
+                return False
+            if not src_block:
+                return True
+
+def _copy_fd(src_fd, dst_fd, size):
+    '''
+    Copy file contents in kernel space with copy_file_range() or
+    sendfile() falling back to chunked read/write.
+    '''
+    blocksize = 8 * 1024 * 1024
+    copied = 0
+    if hasattr(os, 'copy_file_range'):
+        try:
+            while copied < size:
+                sent = os.copy_file_range(src_fd, dst_fd, blocksize)
+                if not sent:
+                    break
+                copied += sent
+            return
+        except OSError:
+            # EXDEV on old kernels, ENOSYS, EINVAL for special filesystems
+            if copied:
+                raise
+    try:
+        while copied < size:
+            sent = os.sendfile(dst_fd, src_fd, copied, blocksize)
+            if not sent:
+                break
+            copied += sent
+        return
+    except OSError:
+        if copied:
+            raise
+    while True:
+        data = os.read(src_fd, blocksize)
+        if not data:
+            break
+        os.write(dst_fd, data)
+
+def copy_file_if_changed(source, target, mode=0o644, uid=-1, gid=-1):
+    '''
+    Copy local file without loading it into memory. The copy is written to
+    the temporary file which gets mode, ownership and modification time of
+    the source before it is renamed over the target. Nothing is copied in
+    case the target is up to date, only its mode and ownership are fixed.
+
+    :return: True in case the file was copied and False otherwise
+    '''
+    if is_file_up_to_date(source, target):
+        dst_stat = os.stat(target)
+        src_mtime = os.stat(source).st_mtime_ns
+        if dst_stat.st_mtime_ns != src_mtime:
+            # Make the next check cheap
+            os.utime(target, ns=(dst_stat.st_atime_ns, src_mtime))
+        if stat.S_IMODE(dst_stat.st_mode) != mode:
+            os.chmod(target, mode)
+        if (uid not in (-1, dst_stat.st_uid)) or (gid not in (-1, dst_stat.st_gid)):
+            os.chown(target, uid, gid)
+        return False
+
+    path = Path(target)
+    fd, tmpfile = tempfile.mkstemp('', '.{}.'.format(path.name), str(path.parent))
+    try:
+        with open(source, 'rb') as src:
+            src_stat = os.fstat(src.fileno())
+            _copy_fd(src.fileno(), fd, src_stat.st_size)
+        os.fchmod(fd, mode)
+        if uid != -1 or gid != -1:
+            os.fchown(fd, uid, gid)
+        os.utime(fd, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+        os.close(fd)
+        fd = None
+        os.rename(tmpfile, str(path))
+    except:
+        if fd is not None:
+            os.close(fd)
+        tmppath = Path(tmpfile)
+        if tmppath.exists():
+            tmppath.unlink()
+        raise
+    return True
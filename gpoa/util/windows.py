@@ -19,6 +19,7 @@
 
 import os
 import subprocess
+from functools import lru_cache
 from samba import getopt as options
 from samba import NTSTATUSError
 
@@ -292,9 +293,12 @@ class SiteDomainScanner:
     def select_pdc_emulator_server(self):
         return self.pdc_emulator
 
-def expand_windows_var(text, username=None):
+@lru_cache(maxsize=None)
+def get_windows_variables(username=None):
     '''
-    Scan the line for percent-encoded variables and expand them.
+    Build the table of Windows variables with their expanded values for
+    the user. The table is cached for the run since computing DesktopDir
+    requires running xdg-user-dir.
     '''
     variables = dict()
     variables['HOME'] = '/etc/skel'
@@ -313,11 +317,19 @@ def expand_windows_var(text, username=None):
         variables['StartMenuDir'] = os.path.join(
             variables['HOME'], '.local', 'share', 'applications')
 
+    return tuple(('%{}%'.format(var), value if value[-1] == '/' else value + '/')
+        for var, value in variables.items())
+
+def expand_windows_var(text, username=None):
+    '''
+    Scan the line for percent-encoded variables and expand them.
+    '''
+    if '%' not in text:
+        return text
+
     result = text
-    for var in variables.keys():
-        result = result.replace('%{}%'.format(var),
-                                 variables[var] if variables[var][-1] == '/'
-                                 else variables[var] +'/')
+    for var, value in get_windows_variables(username):
+        result = result.replace(var, value)
 
     return result
 